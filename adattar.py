@@ -0,0 +1,40 @@
+import os
+import shutil
+import sqlite3
+from PyQt5.QtCore import QStandardPaths
+
+# Az alkalmazás minden tartós adata (gyorsítótárak, indexek, mentett keresések)
+# egyetlen mappában: Linuxon ~/.local/share/fajlkezelo, Windowson %LOCALAPPDATA%\fajlkezelo
+APP_DATA_NAME = "fajlkezelo"
+
+def app_data_dir():
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation) or os.path.expanduser("~")
+    return os.path.join(base, APP_DATA_NAME)
+
+def app_data_path(name, legacy=None):
+    """Fájl vagy mappa helye az alkalmazás adatmappájában.
+
+    A legacy a korábbi, közvetlenül a saját mappában tárolt név (pl.
+    ".fajlkereso_index.sqlite"): ha az még létezik, egyszer átkerül az új
+    helyre (SQLite esetén a -wal/-shm fájlokkal együtt).
+    """
+    folder = app_data_dir()
+    path = os.path.join(folder, name)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        if legacy:
+            old = os.path.join(os.path.expanduser("~"), legacy)
+            if os.path.exists(old) and not os.path.exists(path):
+                for suffix in ("-wal", "-shm", ""):
+                    if os.path.exists(old + suffix):
+                        shutil.move(old + suffix, path + suffix)
+    except OSError:
+        pass
+    return path
+
+def open_database(path):
+    """SQLite kapcsolat WAL naplózással: az olvasók nem várnak az írókra"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -12,6 +12,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont,  QBrush, QColor
+from exportalo import export_rows
 
 class FileCopyApp(QWidget):
     def __init__(self, parent=None):
@@ -123,6 +124,8 @@ class FileCopyApp(QWidget):
         btn_duplicates.clicked.connect(self.manage_duplicates)
         btn_empty_folders = QPushButton("Üres mappák kezelése")
         btn_empty_folders.clicked.connect(self.manage_empty_folders)
+        btn_export = QPushButton("Lista mentése")
+        btn_export.clicked.connect(self.export_list)
         btn_copy = QPushButton("Másolás")
         btn_copy.clicked.connect(self.copy_files)
         
@@ -130,6 +133,7 @@ class FileCopyApp(QWidget):
         btn_layout.addWidget(btn_deselect_all)
         btn_layout.addWidget(btn_duplicates)
         btn_layout.addWidget(btn_empty_folders)
+        btn_layout.addWidget(btn_export)
         btn_layout.addStretch()
         btn_layout.addWidget(btn_copy)
         
@@ -288,6 +292,25 @@ class FileCopyApp(QWidget):
                 self.file_vars[path]["selected"] = False
         self.selected_items = set()
 
+    def export_list(self):
+        rows = []
+        for i in range(self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(i)
+            rows.append([
+                item.text(1),
+                int(item.text(2)) if item.text(2).isdigit() else item.text(2),
+                item.text(3),
+                item.text(4),
+                item.data(0, Qt.UserRole)
+            ])
+        export_rows(
+            self,
+            ["Fájlnév", "Méret (KB)", "Módosítva", "Duplikátum", "Elérési út"],
+            rows,
+            "fajllista",
+            sheet_title="Fájlok"
+        )
+
     def manage_duplicates(self):
         # Collect duplicates
         duplicates = {}
@@ -0,0 +1,141 @@
+import os
+import csv
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+
+# Egy Excel munkalap legfeljebb ennyi sort tartalmazhat (fejléccel együtt)
+XLSX_MAX_ROWS = 1048576
+PROGRESS_STEP = 5000
+
+class ExportWorker(QThread):
+    """Listák mentése háttérszálon: XLSX (openpyxl write-only) vagy CSV.
+
+    A write-only munkafüzet a sorokat azonnal lemezre írja, így a memóriaigény
+    nem nő a sorok számával; a túl hosszú listák új munkalapon folytatódnak.
+    Az írás ideiglenes fájlba történik, és csak sikeres befejezéskor kerül a
+    célhelyre, így megszakításkor egy felülírásra kijelölt fájl is érintetlen marad.
+    """
+    progress = pyqtSignal(int)
+    finished_ok = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, path, headers, rows, sheet_title="Eredmények"):
+        super().__init__()
+        self.path = path
+        self.headers = headers
+        self.rows = rows
+        self.sheet_title = sheet_title
+        self._is_running = True
+
+    def run(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            if self.path.lower().endswith('.csv'):
+                self.write_csv(tmp_path)
+            else:
+                self.write_xlsx(tmp_path)
+            if self._is_running:
+                os.replace(tmp_path, self.path)
+                self.finished_ok.emit(self.path)
+            else:
+                self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def write_csv(self, path):
+        # utf-8-sig és pontosvessző: a magyar Excel így nyitja meg helyesen
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(self.headers)
+            total = len(self.rows)
+            for i, row in enumerate(self.rows, 1):
+                if not self._is_running:
+                    return
+                writer.writerow(row)
+                if i % PROGRESS_STEP == 0:
+                    self.progress.emit(int(i / total * 100))
+        self.progress.emit(100)
+
+    def write_xlsx(self, path):
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = None
+        sheet_rows = XLSX_MAX_ROWS
+        sheet_no = 0
+        total = len(self.rows)
+        for i, row in enumerate(self.rows, 1):
+            if not self._is_running:
+                return
+            if sheet_rows >= XLSX_MAX_ROWS:
+                sheet_no += 1
+                title = self.sheet_title if sheet_no == 1 else f"{self.sheet_title} {sheet_no}"
+                ws = wb.create_sheet(title=title[:31])
+                ws.append(self.headers)
+                sheet_rows = 1
+            ws.append(list(row))
+            sheet_rows += 1
+            if i % PROGRESS_STEP == 0:
+                self.progress.emit(int(i / total * 100))
+        if ws is None:
+            ws = wb.create_sheet(title=self.sheet_title[:31])
+            ws.append(self.headers)
+        wb.save(path)
+        self.progress.emit(100)
+
+    def stop(self):
+        self._is_running = False
+
+def export_rows(parent, headers, rows, default_name, on_saved=None, sheet_title="Eredmények"):
+    """Mentési hely bekérése és a lista exportálása háttérszálon, folyamatjelzővel.
+
+    A rows listáról másolat készül, így a hívó közben tovább módosíthatja a
+    sajátját. Siker esetén az on_saved(path) hívódik meg a GUI szálon.
+    """
+    if not rows:
+        QMessageBox.information(parent, "Nincs adat", "Nincs mentendő eredmény!")
+        return None
+
+    save_path, selected_filter = QFileDialog.getSaveFileName(
+        parent,
+        "Eredmények mentése",
+        f"{default_name}.xlsx",
+        "Excel fájlok (*.xlsx);;CSV fájlok (*.csv)"
+    )
+    if not save_path:
+        return None
+    if not os.path.splitext(save_path)[1]:
+        save_path += ".csv" if "csv" in selected_filter.lower() else ".xlsx"
+
+    dialog = QProgressDialog("Mentés folyamatban...", "Mégse", 0, 100, parent)
+    dialog.setWindowTitle("Exportálás")
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(500)
+
+    worker = ExportWorker(save_path, headers, list(rows), sheet_title)
+    worker.progress.connect(dialog.setValue)
+    dialog.canceled.connect(worker.stop)
+
+    def done(path):
+        dialog.close()
+        QMessageBox.information(parent, "Sikeres mentés", f"Eredmények mentve: {path}")
+        if on_saved:
+            on_saved(path)
+
+    def fail(message):
+        dialog.close()
+        QMessageBox.critical(parent, "Hiba", f"Mentés sikertelen!\n{message}")
+
+    worker.finished_ok.connect(done)
+    worker.failed.connect(fail)
+    worker.cancelled.connect(dialog.close)
+    # A referencia megtartása, különben a szál a futás közben felszabadulna
+    parent._export_worker = worker
+    worker.start()
+    return worker
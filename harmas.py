@@ -2,17 +2,35 @@ import os
 import sys
 import subprocess
 import platform
+import shutil
+import hashlib
+import struct
+import threading
+import multiprocessing
 import concurrent.futures
+from array import array
+from collections import deque, OrderedDict
+from datetime import datetime
+from urllib.parse import quote
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTreeWidget,
     QTreeWidgetItem, QFileDialog, QAbstractItemView, QHeaderView,
     QLabel, QCheckBox, QSplitter, QMessageBox,  QProgressBar,
-    QGraphicsView, QGraphicsScene
+    QGraphicsView, QGraphicsScene, QListView, QTabWidget, QApplication,
+    QDialog, QSpinBox, QDoubleSpinBox, QLineEdit, QTableWidget, QTableWidgetItem, QTreeView
+)
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QThread, QObject, QSize, QRect, QTimer, QUrl, QEvent, QAbstractListModel, QModelIndex
+)
+from PyQt5.QtMultimedia import (
+    QMediaPlayer, QMediaContent, QAbstractVideoSurface, QAbstractVideoBuffer, QVideoFrame
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QThread
-from PyQt5.QtMultimedia import QMediaPlayer
 from PyQt5.QtMultimediaWidgets import QVideoWidget
-from PyQt5.QtGui import QPixmap, QFont,  QColor, QBrush, QPainter
+from PyQt5.QtGui import (
+    QPixmap, QFont,  QColor, QBrush, QPainter, QImage, QImageReader, QImageIOHandler, QIcon,
+    QStandardItemModel, QStandardItem
+)
+from adattar import app_data_path, open_database
 
 # PDF olvasási hiba javítása
 try:
@@ -21,85 +39,1597 @@ except ImportError:
     PdfReader = None
     print("Figyelmeztetés: PyPDF2 nincs telepítve, PDF fájlok nem lesznek támogatva")
 
-class MediaScanner(QThread):
-    media_found = pyqtSignal(str, str, float, str)  # file, path, size, file_type
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    print("Figyelmeztetés: numpy nincs telepítve, a hasonló képek keresése és a statisztika nem elérhető")
+
+THUMB_CACHE_DIR = app_data_path("belyegkepek", legacy=".fajlkezelo_thumbs")
+THUMB_SIZE = 128
+THUMB_MEMORY_LIMIT = 2000   # ennyi bélyegkép marad a memóriában (LRU)
+THUMB_QUEUE_LIMIT = 512     # ennél régebbi, még el nem kezdett kérések elvesznek
+IMAGE_CACHE_LIMIT = 256 * 1024 * 1024   # a dekódolt előnézeti képek memóriakerete
+PREFETCH_COUNT = 2          # ennyi szomszédos kép előtöltése mindkét irányban
+TILE_SIZE = 512             # csempeméret az adott nagyítási szint pixeleiben
+TILE_CACHE_LIMIT = 192 * 1024 * 1024
+
+TILES_NONE = 0              # a kép elfér az előnézetben, csempézés nem kell
+TILES_CLIP = 1              # csempénként kivágva dekódolható (QImageReader.setClipRect)
+TILES_PREVIEW = 2           # a formátum (pl. TIFF, PNG) nem tud kivágni: csak az előnézet felbontása
+
+def tile_mode(path, preview_size):
+    """A kép csempézési módja a fejléc alapján (teljes dekódolás nélkül)"""
+    reader = QImageReader(path)
+    size = reader.size()
+    if not size.isValid() or reader.transformation() != QImageIOHandler.TransformationNone:
+        return size, TILES_NONE
+    if size.width() <= preview_size.width() and size.height() <= preview_size.height():
+        return size, TILES_NONE
+    if reader.supportsOption(QImageIOHandler.ClipRect):
+        return size, TILES_CLIP
+    # Kivágás nélkül minden csempéhez a teljes képet kellene dekódolni, ezért ezeknél
+    # a formátumoknál nincs teljes felbontású nagyítás
+    return size, TILES_PREVIEW
+
+def decode_tile(path, level, rect):
+    """A teljes felbontású rect terület dekódolása 2^level kicsinyítéssel"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(False)
+    reader.setClipRect(rect)
+    factor = 1 << level
+    reader.setScaledSize(QSize(max(1, -(-rect.width() // factor)), max(1, -(-rect.height() // factor))))
+    return reader.read()
+
+def read_scaled_image(path, max_width, max_height):
+    """Kép dekódolása eleve csökkentett méretben.
+
+    A QImageReader.setScaledSize() mellett a dekóder (pl. JPEG) nem bontja ki a
+    teljes felbontást, így egy 50 MP-es fotó is töredék idő és memória alatt
+    olvasható be. Hibás fájlnál üres (isNull) QImage-et ad.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and (size.width() > max_width or size.height() > max_height):
+        reader.setScaledSize(size.scaled(max_width, max_height, Qt.KeepAspectRatio))
+    return reader.read()
+
+def thumbnail_cache_path(path, size, mtime, thumb_size=THUMB_SIZE):
+    """Bélyegkép helye a lemezes gyorsítótárban (freedesktop mintájára md5 név).
+
+    A kulcs az útvonal mellett a méretet és a módosítási időt is tartalmazza,
+    így a megváltozott fájlhoz automatikusan új bélyegkép készül.
+    """
+    key = f"{os.path.abspath(path)}|{size}|{mtime}"
+    name = hashlib.md5(key.encode("utf-8")).hexdigest() + ".png"
+    return os.path.join(THUMB_CACHE_DIR, str(thumb_size), name)
+
+def load_thumbnail(path, thumb_size=THUMB_SIZE):
+    """Bélyegkép a gyorsítótárból, vagy csökkentett dekódolással elkészítve és eltárolva"""
+    st = os.stat(path)
+    cache_path = thumbnail_cache_path(path, st.st_size, st.st_mtime, thumb_size)
+    if os.path.exists(cache_path):
+        image = QImage(cache_path)
+        if not image.isNull():
+            return image
+    image = read_scaled_image(path, thumb_size, thumb_size)
+    if not image.isNull():
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        if image.save(tmp_path, "PNG"):
+            os.replace(tmp_path, cache_path)
+    return image
+
+class ThumbnailEngine(QObject):
+    """Bélyegképek készítése háttérszálakon.
+
+    A kérések veremként kerülnek feldolgozásra (a legújabb először), így
+    gyors görgetésnél az éppen látható cellák kapnak elsőbbséget, a
+    THUMB_QUEUE_LIMIT-nél régebbi, el sem kezdett kérések pedig elvesznek.
+    A QImage szálbiztos; QPixmap csak a GUI szálon készül belőle.
+    """
+    thumbnail_ready = pyqtSignal(str, QImage)
+
+    def __init__(self, thumb_size=THUMB_SIZE, parent=None):
+        super().__init__(parent)
+        self.thumb_size = thumb_size
+        self.requests = deque()
+        self.pending = set()
+        self.condition = threading.Condition()
+        num_workers = max(1, os.cpu_count() - 1)
+        for _ in range(num_workers):
+            threading.Thread(target=self.worker, daemon=True).start()
+
+    def request(self, path):
+        with self.condition:
+            if path in self.pending:
+                return
+            self.pending.add(path)
+            self.requests.append(path)
+            if len(self.requests) > THUMB_QUEUE_LIMIT:
+                self.pending.discard(self.requests.popleft())
+            self.condition.notify()
+
+    def clear(self):
+        with self.condition:
+            self.requests.clear()
+            self.pending.clear()
+
+    def worker(self):
+        while True:
+            with self.condition:
+                while not self.requests:
+                    self.condition.wait()
+                path = self.requests.pop()
+            try:
+                image = load_thumbnail(path, self.thumb_size)
+            except OSError:
+                image = QImage()
+            with self.condition:
+                self.pending.discard(path)
+            self.thumbnail_ready.emit(path, image)
+
+def contiguous_ranges(rows):
+    """Sorszámok összefüggő (első, darab) tartományai csökkenő sorrendben, eltávolításhoz"""
+    rows = sorted(rows, reverse=True)
+    i = 0
+    while i < len(rows):
+        last = first = rows[i]
+        while i + 1 < len(rows) and rows[i + 1] == first - 1:
+            i += 1
+            first = rows[i]
+        yield first, last - first + 1
+        i += 1
+
+class MediaGridModel(QAbstractListModel):
+    """Rácsnézet modellje: bélyegképet csak a nézet által lekért (látható) cellákhoz kér"""
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.rows = []          # (útvonal, fájlnév, típus)
+        self.row_of = {}
+        self.thumbs = OrderedDict()
+        self.failed = set()
+        self.placeholders = {}
+        engine.thumbnail_ready.connect(self.on_thumbnail)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path, name, file_type = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role in (Qt.ToolTipRole, Qt.UserRole):
+            return path
+        if role == Qt.DecorationRole:
+            pixmap = self.thumbs.get(path)
+            if pixmap is not None:
+                self.thumbs.move_to_end(path)
+                return pixmap
+            if file_type == "Kép" and path not in self.failed:
+                self.engine.request(path)
+            return self.placeholder(file_type)
+        return None
+
+    def placeholder(self, file_type):
+        if file_type not in self.placeholders:
+            colors = {"Kép": QColor(52, 152, 219), "Videó": QColor(231, 76, 60), "Hang": QColor(46, 204, 113)}
+            pixmap = QPixmap(THUMB_SIZE, THUMB_SIZE)
+            pixmap.fill(QColor(60, 60, 60))
+            painter = QPainter(pixmap)
+            painter.setPen(colors.get(file_type, QColor(149, 165, 166)))
+            painter.setFont(QFont("Segoe UI", 14, QFont.Bold))
+            painter.drawText(pixmap.rect(), Qt.AlignCenter, file_type)
+            painter.end()
+            self.placeholders[file_type] = pixmap
+        return self.placeholders[file_type]
+
+    def add_rows(self, new_rows):
+        if not new_rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+        for i, row in enumerate(new_rows, first):
+            self.row_of[row[0]] = i
+        self.rows.extend(new_rows)
+        self.endInsertRows()
+
+    def set_types(self, changes):
+        for path, file_type in changes:
+            row = self.row_of.get(path)
+            if row is None:
+                continue
+            self.rows[row] = (path, self.rows[row][1], file_type)
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def remove_paths(self, paths):
+        """Sorok eltávolítása helyben, összefüggő tartományonként"""
+        for first, count in contiguous_ranges([self.row_of[p] for p in paths if p in self.row_of]):
+            self.beginRemoveRows(QModelIndex(), first, first + count - 1)
+            del self.rows[first:first + count]
+            self.endRemoveRows()
+        for path in paths:
+            self.thumbs.pop(path, None)
+        self.row_of = {row[0]: i for i, row in enumerate(self.rows)}
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.row_of = {}
+        self.thumbs.clear()
+        self.failed.clear()
+        self.endResetModel()
+        self.engine.clear()
+
+    def on_thumbnail(self, path, image):
+        row = self.row_of.get(path)
+        if row is None:
+            return
+        if image.isNull():
+            self.failed.add(path)
+            return
+        self.thumbs[path] = QPixmap.fromImage(image)
+        while len(self.thumbs) > THUMB_MEMORY_LIMIT:
+            self.thumbs.popitem(last=False)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+MEDIA_TYPES = {
+    '.jpg': "Kép", '.jpeg': "Kép", '.png': "Kép", '.gif': "Kép", '.bmp': "Kép", '.tiff': "Kép",
+    '.tif': "Kép", '.webp': "Kép", '.heic': "Kép", '.heif': "Kép", '.avif': "Kép",
+    '.cr2': "Kép", '.cr3': "Kép", '.nef': "Kép", '.arw': "Kép", '.dng': "Kép", '.orf': "Kép",
+    '.rw2': "Kép", '.raf': "Kép",
+    '.mp4': "Videó", '.mov': "Videó", '.avi': "Videó", '.mkv': "Videó", '.m4v': "Videó",
+    '.webm': "Videó", '.3gp': "Videó", '.mts': "Videó", '.mpg': "Videó", '.mpeg': "Videó",
+    '.mp3': "Hang", '.wav': "Hang", '.flac': "Hang", '.m4a': "Hang", '.aac': "Hang",
+    '.ogg': "Hang", '.opus': "Hang",
+}
+MEDIA_EXTENSIONS = frozenset(MEDIA_TYPES)
+
+# Tartalom alapú felismerés: ennyi bájt elég minden ismert fejléchez
+SNIFF_BYTES = 512
+SNIFF_BATCH = 256
+# Ezeket a kiterjesztéseket a felismerés sem olvassa be (biztosan nem médiafájlok)
+SNIFF_SKIP_EXTENSIONS = frozenset({
+    '.txt', '.log', '.ini', '.cfg', '.json', '.xml', '.html', '.htm', '.css', '.js', '.csv',
+    '.py', '.pyc', '.c', '.h', '.cpp', '.java', '.md', '.db', '.sqlite', '.sqlite-wal',
+    '.sqlite-shm', '.exe', '.dll', '.so', '.sys', '.lnk', '.url', '.bat', '.ps1', '.sh',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.rtf',
+    '.zip', '.rar', '.7z', '.gz', '.tar', '.iso', '.msi', '.thm', '.xmp', '.aae',
+})
+# ISO BMFF (ftyp) márkák, amelyek nem videót jelölnek
+FTYP_IMAGE_BRANDS = frozenset({b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1', b'avif', b'avis', b'crx '})
+FTYP_AUDIO_BRANDS = frozenset({b'M4A ', b'M4B ', b'M4P ', b'F4A ', b'F4B '})
+
+def sniff_media_type(path):
+    """Médiatípus a fájl első bájtjai alapján ("Kép", "Videó", "Hang"), vagy None.
+
+    A kiterjesztéstől függetlenül ismeri fel a JPEG/PNG/GIF/BMP/TIFF (és az arra
+    épülő CR2/NEF/ARW/DNG), WebP, HEIC/AVIF, ISO BMFF (MP4/MOV/M4A), Matroska,
+    RIFF (AVI/WAV), FLAC, Ogg és MP3 fájlokat.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return None
+    if len(head) < 12:
+        return None
+    if head.startswith((b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a',
+                        b'II*\x00', b'MM\x00*', b'IIRO', b'IIRS', b'IIU\x00', b'FUJIFILMCCD-RAW')):
+        return "Kép"
+    if head.startswith(b'BM') and int.from_bytes(head[6:10], 'little') == 0:
+        return "Kép"
+    if head.startswith(b'RIFF'):
+        return {b'WEBP': "Kép", b'AVI ': "Videó", b'WAVE': "Hang"}.get(head[8:12])
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in FTYP_IMAGE_BRANDS:
+            return "Kép"
+        return "Hang" if brand in FTYP_AUDIO_BRANDS else "Videó"
+    if head[4:8] in (b'moov', b'mdat', b'wide', b'free', b'skip'):
+        return "Videó"  # régi QuickTime, ftyp nélkül
+    if head.startswith(b'\x1a\x45\xdf\xa3'):
+        return "Videó"  # Matroska / WebM
+    if head.startswith((b'\x00\x00\x01\xba', b'\x00\x00\x01\xb3')) or (head[0] == 0x47 and head[188:189] == b'\x47'):
+        return "Videó"  # MPEG-PS / MPEG-TS
+    if head.startswith(b'OggS'):
+        return "Videó" if b'\x80theora' in head else "Hang"
+    if head.startswith((b'fLaC', b'ID3', b'FORM')):
+        return "Hang"
+    if head[0] == 0xFF and head[1] & 0xE0 == 0xE0 and (head[1] & 0x06 or head[1] & 0xF6 == 0xF0):
+        return "Hang"  # MPEG audio / ADTS AAC kerettel kezdődő fájl
+    return None
+
+def sniff_batch(paths):
+    return [sniff_media_type(path) for path in paths]
+
+MEDIA_INDEX_PATH = app_data_path("media_index.sqlite", legacy=".fajlkezelo_media.sqlite")
+HASH_SIZE = 8               # 8x8 = 64 bites hash
+PHASH_SAMPLE = 32           # a pHash DCT-je ennyiszer ennyi pixelen fut
+SIMILAR_DISTANCE = 6        # alapértelmezett megengedett eltérés (bit)
+
+def read_gray_matrix(image, width, height):
+    """QImage -> width x height méretű szürkeárnyalatos NumPy mátrix"""
+    gray = image.convertToFormat(QImage.Format_Grayscale8).scaled(
+        width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    bits = gray.constBits()
+    bits.setsize(gray.bytesPerLine() * height)
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(height, gray.bytesPerLine())
+    return rows[:, :width].astype(np.float64)
+
+def bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+def dct_matrix(n):
+    k = np.arange(n).reshape(-1, 1)
+    i = np.arange(n).reshape(1, -1)
+    return np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+
+def compute_image_hashes(path):
+    """(dHash, pHash) 64 bites egészként, vagy None, ha a kép nem olvasható.
+
+    Folyamatkészletben fut: a kép eleve kicsinyítve dekódolódik, a hash-ek
+    számítása NumPy-jal történik. A dHash a szomszédos pixelek
+    világosságkülönbségéből, a pHash a 32x32-es kép DCT-jének alacsony
+    frekvenciás együtthatóiból (a medián felett/alatt) képződik.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and (size.width() > 4 * PHASH_SAMPLE or size.height() > 4 * PHASH_SAMPLE):
+        reader.setScaledSize(QSize(4 * PHASH_SAMPLE, 4 * PHASH_SAMPLE))
+    image = reader.read()
+    if image.isNull():
+        return None
+    
+    small = read_gray_matrix(image, HASH_SIZE + 1, HASH_SIZE)
+    dhash = bits_to_int(small[:, 1:] > small[:, :-1])
+    
+    pixels = read_gray_matrix(image, PHASH_SAMPLE, PHASH_SAMPLE)
+    c = dct_matrix(PHASH_SAMPLE)
+    low = (c @ pixels @ c.T)[:HASH_SIZE, :HASH_SIZE]
+    median = np.median(low.ravel()[1:])  # a DC tag nélkül
+    phash = bits_to_int(low > median)
+    return dhash, phash
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+def to_signed64(value):
+    """Az SQLite INTEGER előjeles 64 bites: a hash-ek így tárolhatók"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def from_signed64(value):
+    return value + (1 << 64) if value < 0 else value
+
+class MediaIndex:
+    """Médiafájlok lemezen tárolt (SQLite) adatai útvonal + méret + mtime kulccsal"""
+    def __init__(self, path=MEDIA_INDEX_PATH):
+        self.conn = open_database(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                dhash INTEGER,
+                phash INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS sniffed (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                file_type TEXT
+            );
+            CREATE TABLE IF NOT EXISTS metadata (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                taken REAL,
+                camera TEXT,
+                width INTEGER,
+                height INTEGER,
+                duration REAL
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def get_hashes(self, path, size, mtime):
+        """Tárolt (dhash, phash); (None, None) olvashatatlan képnél; None, ha nincs friss adat"""
+        row = self.conn.execute("SELECT size, mtime, dhash, phash FROM hashes WHERE path = ?",
+                                (path,)).fetchone()
+        if row is None or row[0] != size or row[1] != mtime:
+            return None
+        if row[2] is None:
+            return (None, None)
+        return from_signed64(row[2]), from_signed64(row[3])
+
+    def store_hashes(self, path, size, mtime, hashes):
+        dhash, phash = (to_signed64(hashes[0]), to_signed64(hashes[1])) if hashes else (None, None)
+        self.conn.execute("INSERT OR REPLACE INTO hashes (path, size, mtime, dhash, phash) VALUES (?, ?, ?, ?, ?)",
+                          (path, size, mtime, dhash, phash))
+
+    def get_sniffed(self, path, size, mtime):
+        """Tárolt (file_type,) - a típus None, ha nem médiafájl; None, ha nincs friss adat"""
+        row = self.conn.execute("SELECT size, mtime, file_type FROM sniffed WHERE path = ?",
+                                (path,)).fetchone()
+        if row is None or row[0] != size or row[1] != mtime:
+            return None
+        return (row[2],)
+
+    def store_sniffed(self, path, size, mtime, file_type):
+        self.conn.execute("INSERT OR REPLACE INTO sniffed (path, size, mtime, file_type) VALUES (?, ?, ?, ?)",
+                          (path, size, mtime, file_type))
+
+    def get_metadata(self, path, size, mtime):
+        """Tárolt (taken, camera, width, height, duration), vagy None, ha nincs friss adat"""
+        row = self.conn.execute(
+            "SELECT size, mtime, taken, camera, width, height, duration FROM metadata WHERE path = ?",
+            (path,)).fetchone()
+        if row is None or row[0] != size or row[1] != mtime:
+            return None
+        return row[2:]
+
+    def store_metadata(self, path, size, mtime, meta):
+        self.conn.execute("INSERT OR REPLACE INTO metadata (path, size, mtime, taken, camera, width, height, duration) "
+                          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (path, size, mtime) + tuple(meta))
+
+class BKTree:
+    """Burkhard-Keller fa Hamming-távolsággal: a sugáron belüli hash-ek
+    keresése a háromszög-egyenlőtlenség alapján a fa nagy részét kihagyja"""
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, item):
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, radius):
+        """A value-tól legfeljebb radius távolságra lévő elemek"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            dist = hamming(value, node[0])
+            if dist <= radius:
+                found.extend(node[1])
+            for child_dist, child in node[2].items():
+                if dist - radius <= child_dist <= dist + radius:
+                    stack.append(child)
+        return found
+
+def group_similar(hashes, max_distance):
+    """Hasonló képek csoportjai: hashes = [(útvonal, dhash, phash)].
+
+    A jelöltek a pHash BK-fájából jönnek; egy pár akkor hasonló, ha a
+    dHash-eltérés is a (kétszeres) korláton belül marad. A párokból
+    unió-holmi képez csoportokat.
+    """
+    tree = BKTree()
+    for i, (_, _, phash) in enumerate(hashes):
+        tree.add(phash, i)
+    parent = list(range(len(hashes)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for i, (_, dhash, phash) in enumerate(hashes):
+        for j in tree.search(phash, max_distance):
+            if j > i and hamming(dhash, hashes[j][1]) <= 2 * max_distance:
+                parent[find(j)] = find(i)
+    
+    groups = {}
+    for i in range(len(hashes)):
+        groups.setdefault(find(i), []).append(hashes[i][0])
+    return [paths for paths in groups.values() if len(paths) > 1]
+
+class SimilarImageWorker(QThread):
+    """Perceptuális hash-ek számítása (folyamatkészletben, gyorsítótárral) és csoportosítás"""
     progress = pyqtSignal(int)
-    finished = pyqtSignal()
     status_update = pyqtSignal(str)
+    groups_found = pyqtSignal(list)
 
-    def __init__(self, folder):
+    def __init__(self, paths, max_distance=SIMILAR_DISTANCE):
         super().__init__()
-        self.folder = folder
+        self.paths = paths
+        self.max_distance = max_distance
         self._is_running = True
-        self.media_exts = ['.mp3', '.mp4', '.jpg', '.jpeg', '.png', '.gif', '.mov', '.avi', '.wav', '.mkv', '.bmp', '.tiff']
 
     def run(self):
-        # Összegyűjtjük az összes fájl elérési útját
-        file_paths = []
-        self.status_update.emit("Fájlok listázása...")
-        for root, _, files in os.walk(self.folder):
-            for file in files:
+        index = MediaIndex()
+        try:
+            self.status_update.emit("Hash-ek betöltése...")
+            hashes = []
+            missing = []
+            for path in self.paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                cached = index.get_hashes(path, st.st_size, st.st_mtime)
+                if cached is None:
+                    missing.append((path, st.st_size, st.st_mtime))
+                elif cached[0] is not None:
+                    hashes.append((path, cached[0], cached[1]))
+            
+            if missing:
+                self.status_update.emit(f"Hash számítás: {len(missing)} kép...")
+                num_workers = max(1, os.cpu_count() - 1)
+                # spawn: a fork a futó Qt dekódoló szálak mellett időnként megakasztja a gyermekeket
+                with concurrent.futures.ProcessPoolExecutor(
+                        max_workers=num_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                    futures = {executor.submit(compute_image_hashes, path): (path, size, mtime)
+                               for path, size, mtime in missing}
+                    for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                        if not self._is_running:
+                            for f in futures:
+                                f.cancel()
+                            break
+                        path, size, mtime = futures[future]
+                        try:
+                            result = future.result()
+                            index.store_hashes(path, size, mtime, result)
+                        except Exception:
+                            # Folyamathiba: nem tároljuk, a következő futás újra próbálja
+                            result = None
+                        if result:
+                            hashes.append((path, result[0], result[1]))
+                        if done % 100 == 0 or done == len(missing):
+                            index.commit()
+                            self.progress.emit(int(done / len(missing) * 100))
+                index.commit()
+            if not self._is_running:
+                return
+            
+            self.status_update.emit("Hasonló képek csoportosítása...")
+            groups = group_similar(hashes, self.max_distance)
+            groups.sort(key=len, reverse=True)
+            self.groups_found.emit(groups)
+        finally:
+            index.close()
+
+    def stop(self):
+        self._is_running = False
+
+class SimilarImagesDialog(QDialog):
+    """Hasonló képcsoportok áttekintése és törlése"""
+    def __init__(self, parent, groups):
+        super().__init__(parent)
+        self.finder = parent
+        self.groups = groups
+        self.setWindowTitle("Hasonló képek")
+        self.setGeometry(100, 100, 1000, 700)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.closed = False
+        self.init_ui()
+        self.finder.thumbnail_engine.thumbnail_ready.connect(self.on_thumbnail)
+
+    def done(self, result):
+        # A bélyegkép-jelzésről leválasztás, különben a bezárt párbeszéd is kapná
+        if not self.closed:
+            self.closed = True
+            self.finder.thumbnail_engine.thumbnail_ready.disconnect(self.on_thumbnail)
+        super().done(result)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        lbl_groups = QLabel("Hasonló képcsoportok")
+        lbl_groups.setFont(QFont("Arial", 10, QFont.Bold))
+        layout.addWidget(lbl_groups)
+        
+        self.group_tree = QTreeWidget()
+        self.group_tree.setHeaderLabels(["Csoport", "Képek"])
+        self.group_tree.itemSelectionChanged.connect(self.on_group_selected)
+        layout.addWidget(self.group_tree)
+        
+        lbl_files = QLabel("A csoport képei (a bejelöltek törlődnek)")
+        lbl_files.setFont(QFont("Arial", 10, QFont.Bold))
+        layout.addWidget(lbl_files)
+        
+        self.file_tree = QTreeWidget()
+        self.file_tree.setHeaderLabels(["Fájl", "Méret (MB)", "Elérési út"])
+        self.file_tree.setIconSize(QSize(THUMB_SIZE, THUMB_SIZE))
+        self.file_tree.itemDoubleClicked.connect(lambda item, column: self.finder.open_path(item.text(2)))
+        layout.addWidget(self.file_tree, 2)
+        
+        btn_layout = QHBoxLayout()
+        btn_keep_largest = QPushButton("Csak a legnagyobb marad")
+        btn_keep_largest.clicked.connect(self.mark_all_but_largest)
+        btn_delete_checked = QPushButton("Bejelöltek törlése")
+        btn_delete_checked.clicked.connect(self.delete_checked)
+        btn_close = QPushButton("Bezárás")
+        btn_close.clicked.connect(self.close)
+        
+        btn_layout.addWidget(btn_keep_largest)
+        btn_layout.addWidget(btn_delete_checked)
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_close)
+        layout.addLayout(btn_layout)
+        
+        self.setLayout(layout)
+        self.marked = set()
+        self.populate_groups()
+
+    def populate_groups(self):
+        self.group_tree.clear()
+        for i, paths in enumerate(self.groups, 1):
+            item = QTreeWidgetItem([f"{i}. {os.path.basename(paths[0])}", str(len(paths))])
+            item.setData(0, Qt.UserRole, i - 1)
+            self.group_tree.addTopLevelItem(item)
+
+    def on_group_selected(self):
+        self.sync_marks()
+        selected = self.group_tree.selectedItems()
+        self.file_tree.clear()
+        if not selected:
+            return
+        paths = self.groups[selected[0].data(0, Qt.UserRole)]
+        for path in sorted(paths, key=self.file_size, reverse=True):
+            item = QTreeWidgetItem([os.path.basename(path), f"{self.file_size(path) / (1024 * 1024):.2f}", path])
+            item.setCheckState(0, Qt.Checked if path in self.marked else Qt.Unchecked)
+            self.file_tree.addTopLevelItem(item)
+            self.finder.thumbnail_engine.request(path)
+
+    def on_thumbnail(self, path, image):
+        if image.isNull():
+            return
+        for i in range(self.file_tree.topLevelItemCount()):
+            item = self.file_tree.topLevelItem(i)
+            if item.text(2) == path:
+                item.setIcon(0, QIcon(QPixmap.fromImage(image)))
+
+    @staticmethod
+    def file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def sync_marks(self):
+        for i in range(self.file_tree.topLevelItemCount()):
+            item = self.file_tree.topLevelItem(i)
+            if item.checkState(0) == Qt.Checked:
+                self.marked.add(item.text(2))
+            else:
+                self.marked.discard(item.text(2))
+
+    def mark_all_but_largest(self):
+        """Minden csoportban a legnagyobb fájl kivételével mindent bejelöl"""
+        self.sync_marks()
+        for paths in self.groups:
+            ordered = sorted(paths, key=self.file_size, reverse=True)
+            self.marked.update(ordered[1:])
+            self.marked.discard(ordered[0])
+        self.file_tree.clear()
+        self.on_group_selected()
+
+    def delete_checked(self):
+        self.sync_marks()
+        if not self.marked:
+            QMessageBox.information(self, "Info", "Nincsenek bejelölt fájlok")
+            return
+        self.finder.delete_paths(sorted(self.marked), self.on_deleted)
+
+    def on_deleted(self, deleted):
+        if self.closed:
+            return
+        self.marked -= deleted
+        self.groups = [[p for p in paths if p not in deleted] for paths in self.groups]
+        self.groups = [paths for paths in self.groups if len(paths) > 1]
+        self.file_tree.clear()
+        self.populate_groups()
+
+def unique_path(folder, name):
+    base, ext = os.path.splitext(name)
+    candidate = os.path.join(folder, name)
+    counter = 1
+    while os.path.lexists(candidate):
+        candidate = os.path.join(folder, f"{base}.{counter}{ext}")
+        counter += 1
+    return candidate
+
+def move_to_trash(path):
+    """Fájl áthelyezése a rendszer lomtárába (visszaállítható törlés)"""
+    path = os.path.abspath(path)
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        
+        class SHFILEOPSTRUCTW(ctypes.Structure):
+            _fields_ = [
+                ("hwnd", wintypes.HWND), ("wFunc", wintypes.UINT),
+                ("pFrom", wintypes.LPCWSTR), ("pTo", wintypes.LPCWSTR),
+                ("fFlags", ctypes.c_uint16), ("fAnyOperationsAborted", wintypes.BOOL),
+                ("hNameMappings", ctypes.c_void_p), ("lpszProgressTitle", wintypes.LPCWSTR)
+            ]
+        
+        FO_DELETE = 3
+        # FOF_SILENT | FOF_NOCONFIRMATION | FOF_ALLOWUNDO | FOF_NOERRORUI
+        flags = 0x0004 | 0x0010 | 0x0040 | 0x0400
+        op = SHFILEOPSTRUCTW(None, FO_DELETE, path + "\0", None, flags, False, None, None)
+        result = ctypes.windll.shell32.SHFileOperationW(ctypes.byref(op))
+        if result or op.fAnyOperationsAborted:
+            raise OSError(f"Lomtárba helyezés sikertelen (kód: {result})")
+    elif sys.platform == 'darwin':
+        trash = os.path.expanduser("~/.Trash")
+        shutil.move(path, unique_path(trash, os.path.basename(path)))
+    else:
+        # freedesktop.org lomtár: files/ és info/*.trashinfo
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        files_dir = os.path.join(data_home, "Trash", "files")
+        info_dir = os.path.join(data_home, "Trash", "info")
+        os.makedirs(files_dir, exist_ok=True)
+        os.makedirs(info_dir, exist_ok=True)
+        target = unique_path(files_dir, os.path.basename(path))
+        info_path = os.path.join(info_dir, os.path.basename(target) + ".trashinfo")
+        with open(info_path, "w", encoding="utf-8") as f:
+            f.write("[Trash Info]\n")
+            f.write(f"Path={quote(path)}\n")
+            f.write(f"DeletionDate={datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}\n")
+        try:
+            shutil.move(path, target)
+        except OSError:
+            os.remove(info_path)
+            raise
+
+class DeleteWorker(QThread):
+    """Fájlok törlése (vagy lomtárba helyezése) háttérszálon, kötegelt visszajelzéssel"""
+    progress = pyqtSignal(int)
+    deleted_batch = pyqtSignal(list)
+    done = pyqtSignal(list)  # hibaüzenetek
+
+    def __init__(self, paths, use_trash=False):
+        super().__init__()
+        self.paths = paths
+        self.use_trash = use_trash
+        self._is_running = True
+
+    def run(self):
+        errors = []
+        batch = []
+        total = len(self.paths)
+        for i, path in enumerate(self.paths, 1):
+            if not self._is_running:
+                break
+            try:
+                if self.use_trash:
+                    move_to_trash(path)
+                else:
+                    os.remove(path)
+                batch.append(path)
+            except Exception as e:
+                errors.append(f"{os.path.basename(path)}: {str(e)}")
+            if len(batch) >= 200 or i == total:
+                self.deleted_batch.emit(batch)
+                batch = []
+                self.progress.emit(int(i / total * 100))
+        if batch:
+            self.deleted_batch.emit(batch)
+        self.done.emit(errors)
+
+    def stop(self):
+        self._is_running = False
+
+EXIF_TAG_MAKE = 0x010F
+EXIF_TAG_MODEL = 0x0110
+EXIF_TAG_DATETIME = 0x0132
+EXIF_TAG_EXIF_IFD = 0x8769
+EXIF_TAG_DATETIME_ORIGINAL = 0x9003
+
+def parse_tiff_tags(data, wanted):
+    """TIFF/EXIF blokk IFD0 és EXIF IFD bejegyzéseinek kiolvasása (csak a kért tagek)"""
+    if data[:2] == b"II":
+        endian = "<"
+    elif data[:2] == b"MM":
+        endian = ">"
+    else:
+        return {}
+    tags = {}
+    offsets = [struct.unpack(endian + "I", data[4:8])[0]]
+    visited = set()
+    while offsets:
+        offset = offsets.pop()
+        if offset in visited or offset + 2 > len(data):
+            continue
+        visited.add(offset)
+        count = struct.unpack(endian + "H", data[offset:offset + 2])[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            if entry + 12 > len(data):
+                break
+            tag, kind, n, value = struct.unpack(endian + "HHII", data[entry:entry + 12])
+            if tag == EXIF_TAG_EXIF_IFD:
+                offsets.append(value)
+            elif tag in wanted and kind == 2:  # ASCII
+                start = entry + 8 if n <= 4 else value
+                tags[tag] = data[start:start + n].split(b"\0")[0].decode("latin-1").strip()
+    return tags
+
+def read_exif(path):
+    """EXIF felvételi dátum (időbélyeg) és kamera a JPEG APP1 vagy TIFF fejlécből"""
+    with open(path, "rb") as f:
+        head = f.read(2)
+        if head == b"\xff\xd8":
+            data = None
+            while True:
+                marker = f.read(4)
+                if len(marker) < 4 or marker[0] != 0xFF or marker[1] in (0xD9, 0xDA):
+                    break
+                length = struct.unpack(">H", marker[2:])[0]
+                if marker[1] == 0xE1:
+                    payload = f.read(length - 2)
+                    if payload[:6] == b"Exif\0\0":
+                        data = payload[6:]
+                        break
+                else:
+                    f.seek(length - 2, os.SEEK_CUR)
+            if data is None:
+                return None, None
+        elif head in (b"II", b"MM"):
+            f.seek(0)
+            data = f.read(256 * 1024)
+        else:
+            return None, None
+    tags = parse_tiff_tags(data, {EXIF_TAG_MAKE, EXIF_TAG_MODEL, EXIF_TAG_DATETIME, EXIF_TAG_DATETIME_ORIGINAL})
+    taken = None
+    stamp = tags.get(EXIF_TAG_DATETIME_ORIGINAL) or tags.get(EXIF_TAG_DATETIME)
+    if stamp:
+        try:
+            taken = datetime.strptime(stamp[:19], "%Y:%m:%d %H:%M:%S").timestamp()
+        except (ValueError, OverflowError, OSError):
+            taken = None
+    make = tags.get(EXIF_TAG_MAKE, "")
+    model = tags.get(EXIF_TAG_MODEL, "")
+    camera = model if model.startswith(make) else f"{make} {model}".strip()
+    return taken, camera or None
+
+def iter_boxes(f, start, end):
+    """ISO BMFF (MP4/MOV) dobozok: (típus, tartalom kezdete, doboz vége)"""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+        yield kind, pos + header_size, pos + size
+        pos += size
+
+def read_mp4_info(path):
+    """Hossz a moov/mvhd dobozból, felbontás a tkhd-ből (a mintaadatok olvasása nélkül)"""
+    duration = width = height = None
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        for kind, start, stop in iter_boxes(f, 0, end):
+            if kind != b"moov":
+                continue
+            for sub, sub_start, sub_stop in iter_boxes(f, start, stop):
+                if sub == b"mvhd":
+                    f.seek(sub_start)
+                    data = f.read(32)
+                    if data[0] == 1:
+                        timescale, length = struct.unpack(">IQ", data[20:32])
+                    else:
+                        timescale, length = struct.unpack(">II", data[12:20])
+                    if timescale:
+                        duration = length / timescale
+                elif sub == b"trak":
+                    for box, box_start, box_stop in iter_boxes(f, sub_start, sub_stop):
+                        if box == b"tkhd":
+                            f.seek(box_stop - 8)
+                            w, h = struct.unpack(">II", f.read(8))
+                            if w >> 16 and h >> 16 and not width:
+                                width, height = w >> 16, h >> 16
+            break
+    return duration, width, height
+
+def read_riff_info(path):
+    """WAV: hossz a fmt bájtsebességből és a data méretéből; AVI: az avih fejlécből"""
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    if head[:4] != b"RIFF":
+        return None, None, None
+    if head[8:12] == b"AVI ":
+        pos = head.find(b"avih")
+        if pos < 0 or pos + 48 > len(head):
+            return None, None, None
+        usec_per_frame, = struct.unpack("<I", head[pos + 8:pos + 12])
+        frames, = struct.unpack("<I", head[pos + 24:pos + 28])
+        width, height = struct.unpack("<II", head[pos + 40:pos + 48])
+        return usec_per_frame * frames / 1e6 or None, width or None, height or None
+    if head[8:12] == b"WAVE":
+        byte_rate = data_size = None
+        pos = 12
+        while pos + 8 <= len(head):
+            kind, size = struct.unpack("<4sI", head[pos:pos + 8])
+            if kind == b"fmt ":
+                byte_rate, = struct.unpack("<I", head[pos + 16:pos + 20])
+            elif kind == b"data":
+                data_size = size
+                break
+            pos += 8 + size + (size & 1)
+        if byte_rate and data_size:
+            return data_size / byte_rate, None, None
+    return None, None, None
+
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],   # MPEG-1 Layer III
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],       # MPEG-2/2.5 Layer III
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def read_mp3_duration(path):
+    """MP3 hossza az első keret fejlécéből: VBR-nél a Xing/Info keretszámból, különben a bitrátából"""
+    with open(path, "rb") as f:
+        head = f.read(10)
+        offset = 0
+        if head[:3] == b"ID3" and len(head) == 10:
+            offset = 10 + ((head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F))
+        f.seek(offset)
+        data = f.read(16 * 1024)
+        size = os.fstat(f.fileno()).st_size
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+            continue
+        version = (data[i + 1] >> 3) & 3
+        layer = (data[i + 1] >> 1) & 3
+        bitrate_index = data[i + 2] >> 4
+        rate_index = (data[i + 2] >> 2) & 3
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+        bitrate = MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        samples_per_frame = 1152 if version == 3 else 576
+        mono = (data[i + 3] >> 6) == 3
+        side_info = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+        xing = data[i + 4 + side_info:i + 4 + side_info + 12]
+        if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 1:
+            frames, = struct.unpack(">I", xing[8:12])
+            return frames * samples_per_frame / sample_rate
+        return (size - offset - i) * 8 / bitrate
+    return None
+
+def read_mkv_duration(path):
+    """Matroska: a Segment Info Duration (és TimecodeScale) eleme a fájl elejéről"""
+    with open(path, "rb") as f:
+        data = f.read(64 * 1024)
+    if data[:4] != b"\x1a\x45\xdf\xa3":
+        return None
+    scale = 1000000
+    pos = data.find(b"\x2a\xd7\xb1")
+    if pos >= 0 and pos + 4 <= len(data) and data[pos + 3] & 0x80:
+        n = data[pos + 3] & 0x7F
+        scale = int.from_bytes(data[pos + 4:pos + 4 + n], "big") or scale
+    pos = data.find(b"\x44\x89")
+    if pos < 0 or pos + 3 > len(data):
+        return None
+    if data[pos + 2] == 0x84:
+        value, = struct.unpack(">f", data[pos + 3:pos + 7])
+    elif data[pos + 2] == 0x88:
+        value, = struct.unpack(">d", data[pos + 3:pos + 11])
+    else:
+        return None
+    return value * scale / 1e9
+
+def extract_metadata(path, file_type):
+    """(taken, camera, width, height, duration) a fejlécekből, teljes dekódolás nélkül"""
+    taken = camera = width = height = duration = None
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if file_type == "Kép":
+            size = QImageReader(path).size()
+            if size.isValid():
+                width, height = size.width(), size.height()
+            # A read_exif a fejléc alapján dönt, így a RAW (TIFF alapú) és a
+            # rossz kiterjesztésű JPEG fájlok is működnek
+            taken, camera = read_exif(path)
+        elif ext in ('.mp4', '.mov', '.m4a', '.m4v', '.3gp'):
+            duration, width, height = read_mp4_info(path)
+        elif ext in ('.avi', '.wav'):
+            duration, width, height = read_riff_info(path)
+        elif ext == '.mp3':
+            duration = read_mp3_duration(path)
+        elif ext in ('.mkv', '.webm'):
+            duration = read_mkv_duration(path)
+    except (OSError, struct.error, IndexError, ValueError):
+        pass
+    return taken, camera, width, height, duration
+
+class MetadataWorker(QThread):
+    """Metaadatok kinyerése háttérben; a már indexelt, változatlan fájlok az indexből jönnek"""
+    metadata_batch = pyqtSignal(list)  # [(path, taken, camera, width, height, duration), ...]
+    progress = pyqtSignal(int)
+    status_update = pyqtSignal(str)
+
+    def __init__(self, items):
+        super().__init__()
+        self.items = items  # [(path, file_type), ...]
+        self._is_running = True
+
+    def run(self):
+        index = MediaIndex()
+        try:
+            total = len(self.items)
+            batch = []
+            missing = []
+            for path, file_type in self.items:
                 if not self._is_running:
                     return
-                file_paths.append(os.path.join(root, file))
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                meta = index.get_metadata(path, st.st_size, st.st_mtime)
+                if meta is None:
+                    missing.append((path, file_type, st.st_size, st.st_mtime))
+                else:
+                    batch.append((path,) + tuple(meta))
+            if batch:
+                self.metadata_batch.emit(batch)
+            
+            self.status_update.emit(f"Metaadatok kinyerése: {len(missing)} fájl...")
+            done = total - len(missing)
+            batch = []
+            num_workers = min(8, max(1, os.cpu_count() - 1))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = {executor.submit(extract_metadata, path, file_type): (path, size, mtime)
+                           for path, file_type, size, mtime in missing}
+                for future in concurrent.futures.as_completed(futures):
+                    if not self._is_running:
+                        for f in futures:
+                            f.cancel()
+                        break
+                    path, size, mtime = futures[future]
+                    meta = future.result()
+                    index.store_metadata(path, size, mtime, meta)
+                    batch.append((path,) + meta)
+                    done += 1
+                    if len(batch) >= 500:
+                        index.commit()
+                        self.metadata_batch.emit(batch)
+                        batch = []
+                        self.progress.emit(int(done / total * 100))
+            index.commit()
+            if batch:
+                self.metadata_batch.emit(batch)
+            self.progress.emit(100)
+        finally:
+            index.close()
+
+    def stop(self):
+        self._is_running = False
+
+def format_duration(seconds):
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+# A médialista rendezési kulcsa (szám vagy kisbetűs szöveg). A modell ezen a
+# szerepen natívan rendez; a kulcs nélküli cellák a lista végére kerülnek.
+SORT_ROLE = Qt.UserRole + 1
+MEDIA_LIST_HEADERS = ["Fájl", "Típus", "Méret (MB)", "Törlés", "Készült", "Felbontás", "Hossz", "Kamera"]
+
+KEYFRAME_COUNT = 8
+KEYFRAME_WIDTH = 160
+KEYFRAME_TIMEOUT = 8000     # ms: ennyi után a videó a már kinyert kockákkal zárul
+
+def keyframe_cache_path(path):
+    st = os.stat(path)
+    return thumbnail_cache_path(path, st.st_size, st.st_mtime, f"video{KEYFRAME_COUNT}")
+
+def load_cached_keyframes(path):
+    """A gyorsítótárban egy vízszintes csíkként tárolt kockák szétvágva"""
+    cache_path = keyframe_cache_path(path)
+    if not os.path.exists(cache_path):
+        return None
+    strip = QImage(cache_path)
+    if strip.isNull():
+        return None
+    return [strip.copy(x, 0, KEYFRAME_WIDTH, strip.height())
+            for x in range(0, strip.width() - KEYFRAME_WIDTH + 1, KEYFRAME_WIDTH)]
+
+def save_cached_keyframes(path, frames):
+    height = max(frame.height() for frame in frames)
+    strip = QImage(KEYFRAME_WIDTH * len(frames), height, QImage.Format_RGB32)
+    strip.fill(Qt.black)
+    painter = QPainter(strip)
+    for i, frame in enumerate(frames):
+        painter.drawImage(i * KEYFRAME_WIDTH, (height - frame.height()) // 2, frame)
+    painter.end()
+    cache_path = keyframe_cache_path(path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    if strip.save(tmp_path, "PNG"):
+        os.replace(tmp_path, cache_path)
+
+class FrameGrabber(QAbstractVideoSurface):
+    """Videófelület, amely a lejátszó kockáit QImage-ként adja tovább megjelenítés helyett"""
+    frame_ready = pyqtSignal(QImage)
+
+    def supportedPixelFormats(self, handle_type=QAbstractVideoBuffer.NoHandle):
+        return [QVideoFrame.Format_ARGB32, QVideoFrame.Format_ARGB32_Premultiplied,
+                QVideoFrame.Format_RGB32, QVideoFrame.Format_RGB24, QVideoFrame.Format_RGB565]
+
+    def present(self, frame):
+        image_format = QVideoFrame.imageFormatFromPixelFormat(frame.pixelFormat())
+        if not frame.isValid() or image_format == QImage.Format_Invalid:
+            return False
+        frame = QVideoFrame(frame)
+        if not frame.map(QAbstractVideoBuffer.ReadOnly):
+            return False
+        try:
+            image = QImage(frame.bits(), frame.width(), frame.height(),
+                           frame.bytesPerLine(), image_format).copy()
+        finally:
+            frame.unmap()
+        self.frame_ready.emit(image.scaledToWidth(KEYFRAME_WIDTH, Qt.SmoothTransformation))
+        return True
+
+class KeyframeExtractor(QObject):
+    """Videónként néhány, egyenletesen elosztott kocka kinyerése némított lejátszóval.
+
+    A dekódolást a multimédia-háttér végzi a saját szálain; a videók sorban,
+    egymás után kerülnek feldolgozásra, az eredmény lemezre kerül.
+    """
+    keyframes_ready = pyqtSignal(str, list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.queue = deque()
+        self.current = None
+        self.frames = []
+        self.positions = []
+        self.waiting_for = None
+        self.player = QMediaPlayer(self)
+        self.player.setMuted(True)
+        self.grabber = FrameGrabber(self)
+        self.player.setVideoOutput(self.grabber)
+        self.grabber.frame_ready.connect(self.on_frame)
+        self.player.mediaStatusChanged.connect(self.on_status)
+        self.player.error.connect(lambda error: self.finish())
+        self.timeout = QTimer(self)
+        self.timeout.setSingleShot(True)
+        self.timeout.setInterval(KEYFRAME_TIMEOUT)
+        self.timeout.timeout.connect(self.finish)
+
+    def request(self, path):
+        """Kockák kérése; gyorsítótár-találatnál azonnal, különben a sor elejére kerül"""
+        try:
+            frames = load_cached_keyframes(path)
+        except OSError:
+            frames = None
+        if frames:
+            self.keyframes_ready.emit(path, frames)
+            return
+        if path == self.current:
+            return
+        if path in self.queue:
+            self.queue.remove(path)
+        self.queue.appendleft(path)
+        if self.current is None:
+            self.start_next()
+
+    def start_next(self):
+        if not self.queue:
+            self.current = None
+            return
+        self.current = self.queue.popleft()
+        self.frames = []
+        self.positions = []
+        self.waiting_for = None
+        self.timeout.start()
+        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(self.current)))
+
+    def on_status(self, status):
+        if self.current is None:
+            return
+        if status == QMediaPlayer.LoadedMedia and not self.positions and not self.frames:
+            duration = self.player.duration()
+            if duration <= 0:
+                self.finish()
+                return
+            self.positions = [int(duration * (i + 0.5) / KEYFRAME_COUNT) for i in range(KEYFRAME_COUNT)]
+            self.seek_next()
+        elif status == QMediaPlayer.InvalidMedia:
+            self.finish()
+
+    def seek_next(self):
+        if not self.positions:
+            self.finish()
+            return
+        self.waiting_for = self.positions.pop(0)
+        self.player.setPosition(self.waiting_for)
+        self.player.play()
+
+    def on_frame(self, image):
+        # A pozicionálás előtti, még régi helyről érkező kockák kihagyása
+        if self.waiting_for is None or self.player.position() < self.waiting_for - 500:
+            return
+        self.waiting_for = None
+        self.frames.append(image)
+        self.player.pause()
+        QTimer.singleShot(0, self.seek_next)
+
+    def finish(self):
+        if self.current is None:
+            return
+        self.timeout.stop()
+        self.player.stop()
+        path, frames = self.current, self.frames
+        self.current = None
+        self.frames = []
+        self.positions = []
+        self.waiting_for = None
+        if frames:
+            try:
+                save_cached_keyframes(path, frames)
+            except OSError:
+                pass
+        self.keyframes_ready.emit(path, frames)
+        QTimer.singleShot(0, self.start_next)
+
+class VideoPreview(QWidget):
+    """Videó előnézet: nagy kocka egérrel végigsöpörhető (hover-scrub) és filmszalag"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frames = []
+        self.pixmaps = []
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.frame_label = QLabel("Kattints duplán a fájl megnyitásához")
+        self.frame_label.setAlignment(Qt.AlignCenter)
+        self.frame_label.setStyleSheet("background-color: black; color: white;")
+        self.frame_label.setMinimumHeight(200)
+        self.frame_label.setMouseTracking(True)
+        self.frame_label.installEventFilter(self)
+        layout.addWidget(self.frame_label, 1)
         
-        total_files = len(file_paths)
-        if total_files == 0:
-            self.finished.emit()
+        self.strip = QListView()
+        self.strip.setViewMode(QListView.IconMode)
+        self.strip.setFlow(QListView.LeftToRight)
+        self.strip.setWrapping(False)
+        self.strip.setIconSize(QSize(KEYFRAME_WIDTH // 2, KEYFRAME_WIDTH // 2))
+        self.strip.setFixedHeight(KEYFRAME_WIDTH // 2 + 24)
+        self.strip.setMovement(QListView.Static)
+        self.strip_model = QStandardItemModel(self)
+        self.strip.setModel(self.strip_model)
+        self.strip.clicked.connect(lambda index: self.show_frame(index.row()))
+        layout.addWidget(self.strip)
+
+    def set_loading(self):
+        self.frames = []
+        self.pixmaps = []
+        self.strip_model.clear()
+        self.frame_label.setPixmap(QPixmap())
+        self.frame_label.setText("Kockák kinyerése...")
+
+    def set_frames(self, frames):
+        self.frames = frames
+        self.pixmaps = [QPixmap.fromImage(frame) for frame in frames]
+        self.strip_model.clear()
+        if not frames:
+            self.frame_label.setText("Nem sikerült kockát kinyerni\nKattints duplán a fájl megnyitásához")
             return
-            
-        # Többszálas feldolgozás
-        self.status_update.emit("Fájlok feldolgozása...")
-        processed = 0
-        batch_size = 100  # Kötegenként frissítjük a folyamatjelzőt
-        num_workers = max(1, os.cpu_count() - 1)  # CPU magok száma -1
-        
-        # Feldolgozó függvény
-        def process_file(path):
+        for i, pixmap in enumerate(self.pixmaps):
+            item = QStandardItem(QIcon(pixmap), f"{i + 1}.")
+            item.setEditable(False)
+            self.strip_model.appendRow(item)
+        self.show_frame(0)
+
+    def show_frame(self, index):
+        if 0 <= index < len(self.pixmaps):
+            size = self.frame_label.size()
+            self.frame_label.setPixmap(self.pixmaps[index].scaled(
+                size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def eventFilter(self, obj, event):
+        # Az egér vízszintes helyzete választja ki a megjelenített kockát
+        if obj is self.frame_label and event.type() == QEvent.MouseMove and self.pixmaps:
+            width = max(1, self.frame_label.width())
+            self.show_frame(min(len(self.pixmaps) - 1, int(event.x() / width * len(self.pixmaps))))
+        return super().eventFilter(obj, event)
+
+MEDIA_TYPE_NAMES = ("Kép", "Videó", "Hang")
+MEDIA_TYPE_CODES = {name: code for code, name in enumerate(MEDIA_TYPE_NAMES)}
+# Mérethisztogram: a sáv alsó határa bájtban és a felirata
+SIZE_BUCKETS = [
+    (0, "< 100 KB"), (100 * 1024, "100 KB - 1 MB"), (1024 ** 2, "1 - 10 MB"),
+    (10 * 1024 ** 2, "10 - 100 MB"), (100 * 1024 ** 2, "100 MB - 1 GB"), (1024 ** 3, "> 1 GB"),
+]
+DASHBOARD_FOLDER_LIMIT = 500  # ennyi mappa jelenik meg a táblázatban (méret szerint)
+
+class MediaColumns:
+    """Beolvasott médiafájlok tömör, oszlopos tárolása a statisztikához.
+
+    Fájlonként egy-egy elem kerül a méret (bájt), módosítási idő, típuskód és
+    mappaazonosító tömbökbe (kb. 21 bájt/fájl), így milliós archívum is
+    elfér, és az összesítés NumPy-jal másolás nélkül olvashatja őket.
+    A törölt fájlok típuskódja -1 lesz.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.types = array('b')
+        self.dir_ids = array('i')
+        self.dirs = []
+        self.dir_index = {}
+        self.row_of = {}
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def add(self, path, size, mtime, file_type):
+        folder = os.path.dirname(path)
+        dir_id = self.dir_index.get(folder)
+        if dir_id is None:
+            dir_id = self.dir_index[folder] = len(self.dirs)
+            self.dirs.append(folder)
+        self.row_of[path] = len(self.sizes)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.types.append(MEDIA_TYPE_CODES.get(file_type, -1))
+        self.dir_ids.append(dir_id)
+
+    def set_type(self, path, file_type):
+        row = self.row_of.get(path)
+        if row is not None:
+            self.types[row] = MEDIA_TYPE_CODES.get(file_type, -1)
+
+    def remove(self, path):
+        row = self.row_of.pop(path, None)
+        if row is not None:
+            self.types[row] = -1
+
+    def top_folders(self):
+        """Mappaazonosító -> a gyökér alatti első szintű mappa sorszáma, és a mappanevek"""
+        names = []
+        name_ids = {}
+        group_of_dir = []
+        for folder in self.dirs:
+            rel = os.path.relpath(folder, self.root)
+            name = "(gyökér)" if rel == os.curdir else rel.split(os.sep)[0]
+            group = name_ids.get(name)
+            if group is None:
+                group = name_ids[name] = len(names)
+                names.append(name)
+            group_of_dir.append(group)
+        return np.array(group_of_dir, dtype=np.intp), names
+
+def media_summary(columns):
+    """Mappánkénti, méretsávonkénti és évenkénti összesítés típusonként.
+
+    Minden csoportosítás egyetlen np.bincount a (csoport, típus) párokból
+    képzett kulcson, így milliós fájlszámnál is a másodperc töredéke.
+    """
+    types = np.frombuffer(columns.types, dtype=np.int8)
+    keep = types >= 0
+    types = types[keep].astype(np.intp)
+    sizes = np.frombuffer(columns.sizes, dtype=np.int64)[keep].astype(np.float64)
+    mtimes = np.frombuffer(columns.mtimes, dtype=np.float64)[keep]
+    dir_ids = np.frombuffer(columns.dir_ids, dtype=np.int32)[keep]
+    n_types = len(MEDIA_TYPE_NAMES)
+
+    def group_by(groups, n_groups):
+        key = groups * n_types + types
+        length = n_groups * n_types
+        counts = np.bincount(key, minlength=length).reshape(n_groups, n_types)
+        totals = np.bincount(key, weights=sizes, minlength=length).reshape(n_groups, n_types)
+        return counts, totals
+
+    group_of_dir, folder_names = columns.top_folders()
+    folders = group_of_dir[dir_ids] if len(group_of_dir) else np.zeros(0, dtype=np.intp)
+    folder_counts, folder_totals = group_by(folders, len(folder_names))
+
+    edges = np.array([low for low, _ in SIZE_BUCKETS[1:]], dtype=np.float64)
+    buckets = np.searchsorted(edges, sizes, side='right')
+    bucket_counts, bucket_totals = group_by(buckets, len(SIZE_BUCKETS))
+
+    if len(mtimes):
+        years = mtimes.astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64) + 1970
+        first_year = int(years.min())
+        year_counts, year_totals = group_by((years - first_year).astype(np.intp), int(years.max()) - first_year + 1)
+    else:
+        first_year = 0
+        year_counts = year_totals = np.zeros((0, n_types))
+
+    return {
+        "count": int(len(types)),
+        "total": float(sizes.sum()),
+        "folders": (folder_names, folder_counts, folder_totals),
+        "buckets": (bucket_counts, bucket_totals),
+        "years": (first_year, year_counts, year_totals),
+    }
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} TB"
+
+class MediaScanner(QThread):
+    """Médiafájlok keresése mappánkénti listázással.
+
+    A szűrés a listázás közben, a kiterjesztéshalmazzal történik, a méret a
+    DirEntry-ből jön, az eredmény pedig mappánként egy kötegben érkezik.
+    Szálkészletre nincs szükség: a futási időt a könyvtárak olvasása adja.
+
+    Bekapcsolt tartalom alapú felismerésnél (sniff) a bejárás után a fejlécek
+    is beolvasásra kerülnek: a hiányzó vagy ismeretlen kiterjesztésű
+    médiafájlok új kötegként, a rossz kiterjesztésűek típusjavításként jönnek.
+
+    A statisztikához a talált fájlok oszlopos tömbökbe (MediaColumns) is
+    bekerülnek, ezeket a stats_ready jel adja át a bejárás végén.
+    """
+    media_batch = pyqtSignal(list)  # [(file, path, size, file_type), ...] mappánként
+    media_retyped = pyqtSignal(list)  # [(path, file_type), ...]
+    stats_ready = pyqtSignal(object)  # MediaColumns
+    progress = pyqtSignal(int)
+    finished = pyqtSignal()
+    status_update = pyqtSignal(str)
+
+    def __init__(self, folder, sniff=False):
+        super().__init__()
+        self.folder = folder
+        self.sniff = sniff
+        self._is_running = True
+        self.media_exts = MEDIA_EXTENSIONS
+        self.columns = MediaColumns(folder)
+
+    def run(self):
+        self.status_update.emit("Mappák beolvasása...")
+        stack = [self.folder]
+        done_dirs = 0
+        found = 0
+        last_progress = -1
+        candidates = []  # (file, path, size, mtime, kiterjesztés szerinti típus vagy None)
+        
+        while stack:
             if not self._is_running:
-                return None
-                
-            file = os.path.basename(path)
-            if any(file.lower().endswith(ext) for ext in self.media_exts):
-                try:
-                    size = os.path.getsize(path) / (1024 * 1024)  # MB
-                    file_type = self.get_file_type(file)
-                    return (file, path, size, file_type)
-                except Exception as e:
-                    return None
-            return None
+                return
+            current = stack.pop()
+            batch = []
+            try:
+                it = os.scandir(current)
+            except OSError:
+                it = None
+            if it is not None:
+                with it:
+                    for entry in it:
+                        if not self._is_running:
+                            return
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                        except OSError:
+                            continue
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        if ext not in self.media_exts and (not self.sniff or ext in SNIFF_SKIP_EXTENSIONS):
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        size = st.st_size / (1024 * 1024)  # MB
+                        file_type = MEDIA_TYPES.get(ext)
+                        if self.sniff:
+                            candidates.append((entry.name, entry.path, st.st_size, st.st_mtime, file_type))
+                        if file_type:
+                            batch.append((entry.name, entry.path, size, file_type))
+                            self.columns.add(entry.path, st.st_size, st.st_mtime, file_type)
+            
+            done_dirs += 1
+            if batch:
+                found += len(batch)
+                self.media_batch.emit(batch)
+            # Előrehaladás becslése: a bejárt és a még ismert, hátralévő mappák aránya
+            progress = int(done_dirs / (done_dirs + len(stack)) * 100)
+            if progress != last_progress:
+                last_progress = progress
+                self.progress.emit(progress)
+            if done_dirs % 100 == 0:
+                self.status_update.emit(f"Beolvasás... {done_dirs} mappa, {found} médiafájl")
+        
+        if candidates:
+            self.sniff_candidates(candidates)
+        if self._is_running:
+            self.stats_ready.emit(self.columns)
+            self.finished.emit()
 
-        # Többszálas feldolgozás
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(process_file, path) for path in file_paths]
+    def sniff_candidates(self, candidates):
+        """Fejlécek alapján történő besorolás, indexelt gyorsítótárral és szálkészlettel"""
+        index = MediaIndex()
+        try:
+            results = []
+            missing = []
+            for candidate in candidates:
+                cached = index.get_sniffed(candidate[1], candidate[2], candidate[3])
+                if cached is None:
+                    missing.append(candidate)
+                else:
+                    results.append((candidate, cached[0]))
             
-            for future in concurrent.futures.as_completed(futures):
-                if not self._is_running:
-                    # Megszakítjuk, ha kell
-                    for f in futures:
-                        f.cancel()
-                    return
-                    
-                result = future.result()
-                if result:
-                    self.media_found.emit(*result)
-                    
-                processed += 1
-                if processed % batch_size == 0 or processed == total_files:
-                    self.progress.emit(int((processed / total_files) * 100))
-        
-        self.finished.emit()
+            self.status_update.emit(f"Tartalom alapú felismerés: {len(missing)} fájl...")
+            self.progress.emit(0)
+            num_workers = min(8, max(1, os.cpu_count() - 1))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = {}
+                for start in range(0, len(missing), SNIFF_BATCH):
+                    chunk = missing[start:start + SNIFF_BATCH]
+                    futures[executor.submit(sniff_batch, [c[1] for c in chunk])] = chunk
+                done = 0
+                for future in concurrent.futures.as_completed(futures):
+                    if not self._is_running:
+                        for f in futures:
+                            f.cancel()
+                        return
+                    chunk = futures[future]
+                    for candidate, file_type in zip(chunk, future.result()):
+                        index.store_sniffed(candidate[1], candidate[2], candidate[3], file_type)
+                        results.append((candidate, file_type))
+                    done += 1
+                    self.progress.emit(int(done / len(futures) * 100))
+            index.commit()
+        finally:
+            index.close()
+        
+        added = []
+        retyped = []
+        for (file, path, size, mtime, ext_type), file_type in results:
+            # Ismeretlen fejlécnél a kiterjesztés szerinti besorolás marad
+            if file_type is None or file_type == ext_type:
+                continue
+            if ext_type is None:
+                added.append((file, path, size / (1024 * 1024), file_type))
+                self.columns.add(path, size, mtime, file_type)
+            else:
+                retyped.append((path, file_type))
+                self.columns.set_type(path, file_type)
+        if added:
+            self.media_batch.emit(added)
+        if retyped:
+            self.media_retyped.emit(retyped)
     
     def get_file_type(self, filename):
         """Pontos fájltípus meghatározás a kiterjesztés alapján"""
         ext = os.path.splitext(filename)[1].lower()
-        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']:
-            return "Kép"
-        elif ext in ['.mp4', '.mov', '.avi', '.mkv']:
-            return "Videó"
-        elif ext in ['.mp3', '.wav']:
-            return "Hang"
-        return "Egyéb média"
+        return MEDIA_TYPES.get(ext, "Egyéb média")
     
     def stop(self):
         self._is_running = False
@@ -107,7 +1637,23 @@ class MediaScanner(QThread):
         self.wait()
 
 class ImageViewer(QGraphicsView):
-    """Egyedi képnézegető komponens zoom és görgetés támogatással"""
+    """Egyedi képnézegető komponens zoom és görgetés támogatással.
+
+    A képek háttérszálon, a képernyő felbontására csökkentve dekódolódnak
+    (QImage), a GUI szálon csak a QPixmap készül el. A dekódolt képek egy
+    memóriakorlátos LRU gyorsítótárba kerülnek, a szomszédos elemek előre
+    betölthetők, így a lista léptetése nem vár a dekódolásra.
+
+    A jelenet koordinátái a teljes felbontású kép pixelei. Ha a nagyítás
+    meghaladja az előnézet felbontását, a látható terület csempékből
+    (képpiramis) rajzolódik ki: csak a szükséges csempék dekódolódnak a
+    megfelelő szinten, és egy korlátos gyorsítótárban maradnak. Ez csak a
+    kivágást támogató formátumoknál (pl. JPEG) működik; a többinél (pl. TIFF,
+    PNG) a nézet az előnézet felbontásánál marad, és ezt felirat jelzi.
+    """
+    image_decoded = pyqtSignal(str, QImage, QSize, int)
+    tile_decoded = pyqtSignal(str, int, int, int, QImage)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scene = QGraphicsScene(self)
@@ -120,40 +1666,366 @@ class ImageViewer(QGraphicsView):
         self.pixmap_item = None
         self.setStyleSheet("background-color: black;")
         
+        self.current_path = None
+        self.zoomed = False
+        self.image_cache = OrderedDict()
+        self.cache_bytes = 0
+        self.futures = {}
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.image_decoded.connect(self.on_image_decoded)
+        
+        # Csempék: (útvonal, szint, oszlop, sor) -> QPixmap
+        self.full_size = QSize()
+        self.preview_width = 0
+        self.tiling = TILES_NONE
+        self.tile_cache = OrderedDict()
+        self.tile_cache_bytes = 0
+        self.tile_items = {}
+        self.tile_futures = {}
+        self.tile_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, os.cpu_count() - 1))
+        self.tile_decoded.connect(self.on_tile_decoded)
+        self.tile_timer = QTimer(self)
+        self.tile_timer.setSingleShot(True)
+        self.tile_timer.setInterval(50)
+        self.tile_timer.timeout.connect(self.update_tiles)
+        
+        # Figyelmeztetés a csak előnézeti felbontásban nagyítható képekhez
+        self.notice = QLabel(self)
+        self.notice.setStyleSheet("color: white; background-color: rgba(0, 0, 0, 160); padding: 4px;")
+        self.notice.move(8, 8)
+        self.notice.hide()
+        
+    def decode_size(self):
+        """A képernyő fizikai felbontása: ennél nagyobb előnézetre nincs szükség"""
+        screen = QApplication.primaryScreen()
+        if screen is None:
+            return 1920, 1080
+        size = screen.size() * screen.devicePixelRatio()
+        return size.width(), size.height()
+        
     def display_image(self, path):
-        """Kép betöltése és megjelenítése"""
+        """Kép megjelenítése: gyorsítótárból azonnal, különben háttérben betöltve"""
+        self.current_path = path
+        cached = self.image_cache.get(path)
+        if cached is not None:
+            self.image_cache.move_to_end(path)
+            self.show_image(*cached)
+            return
+        self.clear_scene()
+        text = self.scene.addText("Betöltés...")
+        text.setDefaultTextColor(Qt.white)
+        self.request(path)
+        
+    def prefetch(self, paths):
+        """Szomszédos képek előtöltése; a már nem szükséges, el sem kezdett dekódolások elvetése"""
+        wanted = set(paths)
+        wanted.add(self.current_path)
+        for path, future in list(self.futures.items()):
+            if path not in wanted and future.cancel():
+                del self.futures[path]
+        for path in paths:
+            if path not in self.image_cache:
+                self.request(path)
+        
+    def request(self, path):
+        if path in self.futures:
+            return
+        width, height = self.decode_size()
+        self.futures[path] = self.executor.submit(self.decode, path, width, height)
+        
+    def decode(self, path, width, height):
+        # Háttérszálon fut: csak QImage-dzsel dolgozhat, QPixmap-pel nem
+        try:
+            full_size, mode = tile_mode(path, QSize(width, height))
+            image = read_scaled_image(path, width, height)
+        except Exception:
+            full_size, mode, image = QSize(), TILES_NONE, QImage()
+        self.image_decoded.emit(path, image, full_size, mode)
+        
+    def on_image_decoded(self, path, image, full_size, mode):
+        self.futures.pop(path, None)
+        if not image.isNull():
+            self.cache_image(path, (image, full_size, mode))
+        if path != self.current_path:
+            return
+        if image.isNull():
+            self.show_error("Nem támogatott képformátum")
+        else:
+            self.show_image(image, full_size, mode)
+            
+    def cache_image(self, path, entry):
+        old = self.image_cache.pop(path, None)
+        if old is not None:
+            self.cache_bytes -= old[0].sizeInBytes()
+        self.image_cache[path] = entry
+        self.cache_bytes += entry[0].sizeInBytes()
+        while self.cache_bytes > IMAGE_CACHE_LIMIT and len(self.image_cache) > 1:
+            _, evicted = self.image_cache.popitem(last=False)
+            self.cache_bytes -= evicted[0].sizeInBytes()
+            
+    def show_image(self, image, full_size=QSize(), mode=TILES_NONE):
+        self.clear_scene()
+        self.pixmap_item = self.scene.addPixmap(QPixmap.fromImage(image))
+        self.tiling = mode
+        self.preview_width = image.width()
+        if mode == TILES_CLIP:
+            # Az előnézet a teljes felbontás koordinátáira nagyítva szolgál alapként
+            self.full_size = full_size
+            self.pixmap_item.setScale(full_size.width() / image.width())
+            self.pixmap_item.setTransformationMode(Qt.SmoothTransformation)
+        elif mode == TILES_PREVIEW:
+            self.notice.setText(
+                f"Előnézeti felbontás ({image.width()}×{image.height()}, eredeti: "
+                f"{full_size.width()}×{full_size.height()}) – ebben a formátumban "
+                f"nincs teljes felbontású nagyítás")
+            self.notice.adjustSize()
+            self.notice.show()
+        self.scene.setSceneRect(self.pixmap_item.sceneBoundingRect())
+        self.zoomed = False
+        self.fit_to_view()
+        
+    def clear_scene(self):
+        for future in self.tile_futures.values():
+            future.cancel()
+        self.tile_futures = {}
+        self.tile_items = {}
+        self.tiling = TILES_NONE
+        self.notice.hide()
         self.scene.clear()
+        self.pixmap_item = None
+        
+    def clear(self):
+        self.clear_scene()
+        self.current_path = None
+        
+    def show_error(self, message):
+        # Hiba esetén szöveg megjelenítése
+        self.clear_scene()
+        text = self.scene.addText(f"Hiba: {message}")
+        text.setDefaultTextColor(Qt.white)
+        text.setScale(2)
         
+    def tile_level(self):
+        """A nagyításhoz illő piramisszint, vagy None, ha az előnézet felbontása elég"""
+        scale = self.transform().m11()
+        if self.tiling != TILES_CLIP or scale <= 0:
+            return None
+        if scale * self.full_size.width() <= self.preview_width:
+            return None
+        level = 0
+        while scale * (1 << (level + 1)) <= 1:
+            level += 1
+        if (self.full_size.width() >> level) <= self.preview_width:
+            return None
+        return level
+        
+    def schedule_tiles(self):
+        if self.tiling == TILES_CLIP:
+            self.tile_timer.start()
+            
+    def update_tiles(self):
+        """A látható terület csempéinek megjelenítése, a többi eltávolítása a jelenetből"""
+        path = self.current_path
+        level = self.tile_level()
+        needed = set()
+        if level is not None:
+            span = TILE_SIZE << level
+            visible = self.mapToScene(self.viewport().rect()).boundingRect().intersected(self.scene.sceneRect())
+            if not visible.isEmpty():
+                for ty in range(int(visible.top()) // span, (int(visible.bottom()) - 1) // span + 1):
+                    for tx in range(int(visible.left()) // span, (int(visible.right()) - 1) // span + 1):
+                        needed.add((path, level, tx, ty))
+        
+        for key in list(self.tile_items):
+            if key not in needed:
+                self.scene.removeItem(self.tile_items.pop(key))
+        for key, future in list(self.tile_futures.items()):
+            if key not in needed and future.cancel():
+                del self.tile_futures[key]
+        
+        missing = []
+        for key in needed:
+            if key in self.tile_items:
+                continue
+            pixmap = self.tile_cache.get(key)
+            if pixmap is not None:
+                self.tile_cache.move_to_end(key)
+                self.add_tile_item(key, pixmap)
+            else:
+                missing.append(key)
+        for key in missing:
+            if key not in self.tile_futures:
+                self.tile_futures[key] = self.tile_executor.submit(
+                    self.decode_tile, key, self.tile_rect(key))
+            
+    def tile_rect(self, key):
+        _, level, tx, ty = key
+        span = TILE_SIZE << level
+        return QRect(tx * span, ty * span, span, span).intersected(
+            QRect(0, 0, self.full_size.width(), self.full_size.height()))
+        
+    def decode_tile(self, key, rect):
         try:
-            pixmap = QPixmap(path)
-            if pixmap.isNull():
-                raise Exception("Nem támogatott képformátum")
-                
-            self.pixmap_item = self.scene.addPixmap(pixmap)
-            self.fit_to_view()
-        except Exception as e:
-            # Hiba esetén szöveg megjelenítése
-            text = self.scene.addText(f"Hiba: {str(e)}")
-            text.setDefaultTextColor(Qt.white)
-            text.setScale(2)
+            image = decode_tile(key[0], key[1], rect)
+        except Exception:
+            image = QImage()
+        self.tile_decoded.emit(*key, image)
+        
+    def on_tile_decoded(self, path, level, tx, ty, image):
+        key = (path, level, tx, ty)
+        self.tile_futures.pop(key, None)
+        if image.isNull():
+            return
+        self.cache_tile(key, QPixmap.fromImage(image))
+        if path == self.current_path:
+            self.update_tiles()
+            
+    def cache_tile(self, key, pixmap):
+        self.tile_cache[key] = pixmap
+        self.tile_cache_bytes += pixmap.width() * pixmap.height() * 4
+        while self.tile_cache_bytes > TILE_CACHE_LIMIT and len(self.tile_cache) > 1:
+            _, evicted = self.tile_cache.popitem(last=False)
+            self.tile_cache_bytes -= evicted.width() * evicted.height() * 4
+            
+    def add_tile_item(self, key, pixmap):
+        _, level, tx, ty = key
+        span = TILE_SIZE << level
+        item = self.scene.addPixmap(pixmap)
+        item.setPos(tx * span, ty * span)
+        item.setScale(1 << level)
+        item.setZValue(1)
+        self.tile_items[key] = item
             
     def fit_to_view(self):
         """Kép méretezése az ablak méretéhez"""
         if self.pixmap_item:
             self.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
+            self.schedule_tiles()
             
     def wheelEvent(self, event):
         """Egérgörgővel zoomolás"""
         zoom_factor = 1.15
+        self.zoomed = True
         if event.angleDelta().y() > 0:
             self.scale(zoom_factor, zoom_factor)
         else:
             self.scale(1/zoom_factor, 1/zoom_factor)
+        self.schedule_tiles()
+        
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.schedule_tiles()
             
     def resizeEvent(self, event):
-        """Ablak átméretezésekor a kép méretezése"""
+        """Ablak átméretezésekor a kép méretezése (nagyított képnél a nagyítás megmarad)"""
         super().resizeEvent(event)
-        self.fit_to_view()
+        if not self.zoomed:
+            self.fit_to_view()
+        else:
+            self.schedule_tiles()
+
+class MediaDashboard(QWidget):
+    """Tárhely-statisztika a beolvasott mappáról: mappánkénti összesítés típusonként,
+    mérethisztogram és évenkénti (módosítási dátum szerinti) növekedés"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = None
+        self.dirty = False
+        
+        layout = QVBoxLayout(self)
+        self.lbl_summary = QLabel("Nincs beolvasott mappa")
+        self.lbl_summary.setStyleSheet("font-weight: bold;")
+        layout.addWidget(self.lbl_summary)
+        
+        type_headers = []
+        for name in MEDIA_TYPE_NAMES:
+            type_headers += [f"{name} (db)", f"{name} (méret)"]
+        self.folder_table = self.make_table(["Mappa", "Összesen"] + type_headers)
+        self.size_table = self.make_table(["Méretsáv", "Fájlok", "Méret"] + [f"{name} (db)" for name in MEDIA_TYPE_NAMES])
+        self.year_table = self.make_table(["Év", "Új fájlok", "Új méret", "Összesen (kumulált)"] + [f"{name} (méret)" for name in MEDIA_TYPE_NAMES])
+        
+        splitter = QSplitter(Qt.Vertical)
+        for title, table in (("Mappánként (első szint)", self.folder_table),
+                             ("Méret szerinti eloszlás", self.size_table),
+                             ("Évenkénti növekedés (módosítás dátuma)", self.year_table)):
+            box = QWidget()
+            box_layout = QVBoxLayout(box)
+            box_layout.setContentsMargins(0, 0, 0, 0)
+            box_layout.addWidget(QLabel(title))
+            box_layout.addWidget(table)
+            splitter.addWidget(box)
+        layout.addWidget(splitter, 1)
+
+    def make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return table
+
+    def set_columns(self, columns):
+        self.columns = columns
+        self.invalidate()
+
+    def invalidate(self):
+        """Újraszámolás csak akkor, amikor a lap látható"""
+        self.dirty = True
+        if self.isVisible():
+            self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.dirty:
+            self.refresh()
+
+    def fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem(value)
+                if c > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(r, c, item)
+
+    def refresh(self):
+        self.dirty = False
+        if np is None:
+            self.lbl_summary.setText("A statisztikához a numpy csomag szükséges")
+            return
+        if self.columns is None:
+            self.lbl_summary.setText("Nincs beolvasott mappa")
+            for table in (self.folder_table, self.size_table, self.year_table):
+                table.setRowCount(0)
+            return
+        summary = media_summary(self.columns)
+        self.lbl_summary.setText(f"{summary['count']} médiafájl, összesen {format_bytes(summary['total'])}")
+        
+        names, counts, totals = summary["folders"]
+        order = np.argsort(-totals.sum(axis=1), kind="stable")[:DASHBOARD_FOLDER_LIMIT]
+        rows = []
+        for g in order:
+            row = [names[g], format_bytes(totals[g].sum())]
+            for t in range(len(MEDIA_TYPE_NAMES)):
+                row += [str(counts[g, t]), format_bytes(totals[g, t])]
+            rows.append(row)
+        self.fill(self.folder_table, rows)
+        
+        counts, totals = summary["buckets"]
+        self.fill(self.size_table, [
+            [label, str(counts[b].sum()), format_bytes(totals[b].sum())] + [str(n) for n in counts[b]]
+            for b, (_, label) in enumerate(SIZE_BUCKETS)
+        ])
+        
+        first_year, counts, totals = summary["years"]
+        cumulative = np.cumsum(totals.sum(axis=1))
+        self.fill(self.year_table, [
+            [str(first_year + y), str(counts[y].sum()), format_bytes(totals[y].sum()), format_bytes(cumulative[y])]
+            + [format_bytes(v) for v in totals[y]]
+            for y in range(len(counts)) if counts[y].sum()
+        ])
 
 class MediaFinder(QWidget):
     def __init__(self, parent=None):
@@ -197,6 +2069,12 @@ class MediaFinder(QWidget):
         self.selected_folder = ""
         self.player = QMediaPlayer()
         self.scanner = None
+        self.similar_worker = None
+        self.metadata_worker = None
+        self.delete_worker = None
+        self.checked_paths = set()
+        self.items_by_path = {}
+        self.metadata = {}
         self.init_ui()
         self.set_style()
 
@@ -277,8 +2155,13 @@ class MediaFinder(QWidget):
         self.lbl_folder.setStyleSheet("color: #bdc3c7; font-weight: bold; padding-left: 10px;")
         self.lbl_folder.setFont(QFont("Arial", 10))
         
+        self.sniff_content = QCheckBox("Tartalom alapú felismerés")
+        self.sniff_content.setToolTip("A fájlok fejlécét is megvizsgálja: a hiányzó vagy rossz "
+                                      "kiterjesztésű médiafájlokat is megtalálja (lassabb első beolvasás)")
+        
         folder_layout.addWidget(self.btn_select)
         folder_layout.addWidget(self.lbl_folder, 1)
+        folder_layout.addWidget(self.sniff_content)
         main_layout.addLayout(folder_layout)
 
         # Splitter: fájllista és média nézet
@@ -289,23 +2172,107 @@ class MediaFinder(QWidget):
         file_layout = QVBoxLayout(file_widget)
         file_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Fájl", "Típus", "Méret (MB)", "Törlés"])
+        # Szűrés a metaadatok alapján
+        filter_layout = QHBoxLayout()
+        self.filter_from = QLineEdit()
+        self.filter_from.setPlaceholderText("ÉÉÉÉ-HH-NN")
+        self.filter_to = QLineEdit()
+        self.filter_to.setPlaceholderText("ÉÉÉÉ-HH-NN")
+        self.filter_megapixels = QDoubleSpinBox()
+        self.filter_megapixels.setRange(0, 1000)
+        self.filter_megapixels.setDecimals(1)
+        self.filter_megapixels.setSpecialValueText("-")
+        self.filter_duration = QSpinBox()
+        self.filter_duration.setRange(0, 100000)
+        self.filter_duration.setSpecialValueText("-")
+        for edit in (self.filter_from, self.filter_to):
+            edit.setFixedWidth(95)
+            edit.editingFinished.connect(self.apply_filter)
+        self.filter_megapixels.valueChanged.connect(self.apply_filter)
+        self.filter_duration.valueChanged.connect(self.apply_filter)
+        filter_layout.addWidget(QLabel("Készült:"))
+        filter_layout.addWidget(self.filter_from)
+        filter_layout.addWidget(QLabel("-"))
+        filter_layout.addWidget(self.filter_to)
+        filter_layout.addWidget(QLabel("Min. MP:"))
+        filter_layout.addWidget(self.filter_megapixels)
+        filter_layout.addWidget(QLabel("Min. hossz (mp):"))
+        filter_layout.addWidget(self.filter_duration)
+        filter_layout.addStretch()
+        file_layout.addLayout(filter_layout)
+        
+        # Fájllista: modell/nézet, a rendezés a SORT_ROLE kulcsain C++-ban fut
+        self.tree_model = QStandardItemModel(0, len(MEDIA_LIST_HEADERS), self)
+        self.tree_model.setHorizontalHeaderLabels(MEDIA_LIST_HEADERS)
+        self.tree_model.setSortRole(SORT_ROLE)
+        self.tree_model.itemChanged.connect(self.on_item_changed)
+        self.tree = QTreeView()
+        self.tree.setModel(self.tree_model)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tree.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tree.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tree.header().setSortIndicator(0, Qt.AscendingOrder)
         self.tree.setSortingEnabled(True)
         self.tree.setAlternatingRowColors(True)
         self.tree.header().setSectionResizeMode(QHeaderView.ResizeToContents)
         self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.tree.itemSelectionChanged.connect(self.preview_media)
-        self.tree.itemDoubleClicked.connect(self.open_with_default)
-        file_layout.addWidget(self.tree)
+        self.tree.selectionModel().selectionChanged.connect(self.preview_media)
+        self.tree.doubleClicked.connect(self.open_with_default)
+        
+        # Rácsnézet bélyegképekkel
+        self.thumbnail_engine = ThumbnailEngine(parent=self)
+        self.grid_model = MediaGridModel(self.thumbnail_engine, self)
+        self.grid = QListView()
+        self.grid.setModel(self.grid_model)
+        self.grid.setViewMode(QListView.IconMode)
+        self.grid.setIconSize(QSize(THUMB_SIZE, THUMB_SIZE))
+        self.grid.setGridSize(QSize(THUMB_SIZE + 24, THUMB_SIZE + 40))
+        self.grid.setResizeMode(QListView.Adjust)
+        self.grid.setMovement(QListView.Static)
+        self.grid.setUniformItemSizes(True)
+        self.grid.setLayoutMode(QListView.Batched)
+        self.grid.setBatchSize(500)
+        self.grid.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.grid.selectionModel().currentChanged.connect(self.preview_grid_item)
+        self.grid.doubleClicked.connect(lambda index: self.open_path(index.data(Qt.UserRole)))
+        
+        self.view_tabs = QTabWidget()
+        self.view_tabs.addTab(self.tree, "Lista")
+        self.view_tabs.addTab(self.grid, "Rácsnézet")
+        self.dashboard = MediaDashboard()
+        self.view_tabs.addTab(self.dashboard, "Statisztika")
+        file_layout.addWidget(self.view_tabs)
 
         # Törlés gomb
         self.btn_delete = QPushButton("Kijelöltek törlése")
         self.btn_delete.setFixedHeight(40)
         self.btn_delete.clicked.connect(self.delete_files)
         self.btn_delete.setEnabled(False)
-        file_layout.addWidget(self.btn_delete)
+        
+        # Hasonló képek keresése
+        similar_layout = QHBoxLayout()
+        self.btn_similar = QPushButton("Hasonló képek keresése")
+        self.btn_similar.setFixedHeight(40)
+        self.btn_similar.clicked.connect(self.find_similar_images)
+        self.similar_distance = QSpinBox()
+        self.similar_distance.setRange(0, 20)
+        self.similar_distance.setValue(SIMILAR_DISTANCE)
+        self.similar_distance.setToolTip("Megengedett eltérés bitben (0 = csak szinte azonos képek)")
+        similar_layout.addWidget(self.btn_similar, 1)
+        similar_layout.addWidget(QLabel("Eltérés:"))
+        similar_layout.addWidget(self.similar_distance)
+        
+        self.use_trash = QCheckBox("Lomtárba")
+        self.use_trash.setChecked(True)
+        self.use_trash.setToolTip("Végleges törlés helyett a fájlok a lomtárba kerülnek")
+        
+        action_layout = QHBoxLayout()
+        action_layout.addWidget(self.btn_delete, 1)
+        action_layout.addWidget(self.use_trash)
+        action_layout.addLayout(similar_layout, 1)
+        file_layout.addLayout(action_layout)
 
         # Média nézet
         media_widget = QWidget()
@@ -323,6 +2290,14 @@ class MediaFinder(QWidget):
         media_layout.addWidget(self.video_widget)
         self.video_widget.hide()
         
+        # Videó kulcskockák (filmszalag és egérrel söpörhető előnézet)
+        self.video_preview = VideoPreview()
+        media_layout.addWidget(self.video_preview, 1)
+        self.video_preview.hide()
+        self.keyframe_extractor = KeyframeExtractor(self)
+        self.keyframe_extractor.keyframes_ready.connect(self.on_keyframes)
+        self.preview_path = None
+        
         # Állapotsor
         self.lbl_status = QLabel("Kész")
         self.lbl_status.setAlignment(Qt.AlignCenter)
@@ -345,10 +2320,12 @@ class MediaFinder(QWidget):
         self.setWindowTitle("Médiafájl Kezelő")
         self.resize(1200, 700)
     
-    def open_with_default(self, item, column):
+    def open_with_default(self, index):
         """Fájl megnyitása alapértelmezett programmal"""
-        path = item.data(0, Qt.UserRole)
-        if not os.path.exists(path):
+        self.open_path(self.tree_model.item(index.row(), 0).data(Qt.UserRole))
+
+    def open_path(self, path):
+        if not path or not os.path.exists(path):
             QMessageBox.warning(self, "Hiba", "A fájl nem található!")
             return
             
@@ -371,8 +2348,16 @@ class MediaFinder(QWidget):
             self.load_media()
 
     def load_media(self):
-        self.tree.clear()
-        self.image_viewer.scene.clear()
+        if self.metadata_worker and self.metadata_worker.isRunning():
+            self.metadata_worker.stop()
+            self.metadata_worker.wait()
+        self.tree_model.setRowCount(0)
+        self.items_by_path = {}
+        self.checked_paths = set()
+        self.metadata = {}
+        self.grid_model.clear()
+        self.dashboard.set_columns(None)
+        self.image_viewer.clear()
         self.video_widget.hide()
         self.player.stop()
         self.btn_delete.setEnabled(False)
@@ -388,107 +2373,353 @@ class MediaFinder(QWidget):
             
         self.progress.setVisible(True)
         self.progress.setValue(0)
+        # Rendezés csak a beolvasás és a metaadatok kinyerése után, egyszer
+        self.tree.setSortingEnabled(False)
         
-        self.scanner = MediaScanner(self.selected_folder)
-        self.scanner.media_found.connect(self.add_media_item)
+        self.scanner = MediaScanner(self.selected_folder, self.sniff_content.isChecked())
+        self.scanner.media_batch.connect(self.add_media_items)
+        self.scanner.media_retyped.connect(self.retype_media_items)
+        self.scanner.stats_ready.connect(self.dashboard.set_columns)
         self.scanner.progress.connect(self.progress.setValue)
         self.scanner.finished.connect(self.on_scan_finished)
         self.scanner.status_update.connect(self.lbl_status.setText)
         self.scanner.start()
 
-    def add_media_item(self, file, path, size, file_type):
-        item = QTreeWidgetItem([
-            file, 
-            file_type,
-            f"{size:.2f}"
-        ])
-        item.setData(0, Qt.UserRole, path)
+    def add_media_items(self, batch):
+        """Egy mappa találatainak beszúrása egyszerre"""
+        for file, path, size, file_type in batch:
+            name_item = QStandardItem(file)
+            name_item.setData(path, Qt.UserRole)
+            name_item.setData(file.lower(), SORT_ROLE)
+            type_item = QStandardItem(file_type)
+            type_item.setData(file_type, SORT_ROLE)
+            self.color_type(type_item, file_type)
+            size_item = QStandardItem(f"{size:.2f}")
+            size_item.setData(size, SORT_ROLE)
+            check_item = QStandardItem()
+            check_item.setCheckable(True)
+            check_item.setCheckState(Qt.Unchecked)
+            self.items_by_path[path] = name_item
+            self.tree_model.appendRow([name_item, type_item, size_item, check_item] +
+                                      [QStandardItem() for _ in range(len(MEDIA_LIST_HEADERS) - 4)])
         
-        # Színezés fájltípus szerint
+        self.grid_model.add_rows([(path, file, file_type) for file, path, _, file_type in batch])
+
+    def color_type(self, item, file_type):
+        """Színezés fájltípus szerint"""
         if file_type == "Kép":
-            item.setForeground(1, QBrush(QColor(52, 152, 219)))  # Kék
+            item.setForeground(QBrush(QColor(52, 152, 219)))  # Kék
         elif file_type == "Videó":
-            item.setForeground(1, QBrush(QColor(231, 76, 60)))    # Piros
+            item.setForeground(QBrush(QColor(231, 76, 60)))    # Piros
         elif file_type == "Hang":
-            item.setForeground(1, QBrush(QColor(46, 204, 113)))  # Zöld
-        
-        chk = QCheckBox()
-        chk.stateChanged.connect(lambda state: self.btn_delete.setEnabled(True))
-        self.tree.addTopLevelItem(item)
-        self.tree.setItemWidget(item, 3, chk)
+            item.setForeground(QBrush(QColor(46, 204, 113)))  # Zöld
+
+    def cell(self, item, column):
+        """A fájlnév-elem sorának adott oszlopbeli eleme"""
+        return self.tree_model.item(item.row(), column)
+
+    def retype_media_items(self, changes):
+        """A fejléc alapján javított típusok átvezetése a listába és a rácsnézetbe"""
+        for path, file_type in changes:
+            item = self.items_by_path.get(path)
+            if item is not None:
+                type_item = self.cell(item, 1)
+                type_item.setText(file_type)
+                type_item.setData(file_type, SORT_ROLE)
+                self.color_type(type_item, file_type)
+        self.grid_model.set_types(changes)
 
     def on_scan_finished(self):
         self.progress.setVisible(False)
-        count = self.tree.topLevelItemCount()
+        count = self.tree_model.rowCount()
         self.lbl_status.setText(f"{count} médiafájl betöltve")
         
         if count == 0:
+            self.tree.setSortingEnabled(True)
             QMessageBox.information(self, "Információ", "Nincsenek médiafájlok a mappában.")
         else:
             self.btn_delete.setEnabled(False)
-            self.tree.sortItems(0, Qt.AscendingOrder)
+            header = self.tree.header()
+            self.tree_model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+            self.start_metadata()
+
+    def start_metadata(self):
+        items = [(self.tree_model.item(row, 0).data(Qt.UserRole), self.tree_model.item(row, 1).text())
+                 for row in range(self.tree_model.rowCount())]
+        worker = MetadataWorker(items)
+        worker.metadata_batch.connect(self.apply_metadata)
+        worker.status_update.connect(self.lbl_status.setText)
+        worker.finished.connect(lambda: self.on_metadata_finished(worker))
+        self.metadata_worker = worker
+        worker.start()
+
+    def on_metadata_finished(self, worker):
+        if worker is not self.metadata_worker or not worker._is_running:
+            return
+        # A fejléc szerinti rendezés itt, egyszer fut le az összes metaadattal
+        self.tree.setSortingEnabled(True)
+        self.lbl_status.setText(f"{self.tree_model.rowCount()} médiafájl betöltve, metaadatok kész")
+
+    def apply_metadata(self, batch):
+        """Metaadatok beírása a listába (rendezési kulccsal) és a szűrő újraalkalmazása.
+
+        Cellánkénti jelzés helyett a köteg végén egyetlen dataChanged megy ki:
+        a tartalomhoz igazodó oszlopszélesség minden jelzésre újraszámolódna.
+        """
+        rows = []
+        self.tree_model.blockSignals(True)
+        for path, taken, camera, width, height, duration in batch:
+            item = self.items_by_path.get(path)
+            if item is None:
+                continue
+            self.metadata[path] = (taken, width * height if width and height else None, duration)
+            row = item.row()
+            rows.append(row)
+            if taken:
+                cell = self.tree_model.item(row, 4)
+                cell.setText(datetime.fromtimestamp(taken).strftime("%Y-%m-%d %H:%M"))
+                cell.setData(taken, SORT_ROLE)
+            if width and height:
+                cell = self.tree_model.item(row, 5)
+                cell.setText(f"{width}x{height}")
+                cell.setData(width * height, SORT_ROLE)
+            if duration:
+                cell = self.tree_model.item(row, 6)
+                cell.setText(format_duration(duration))
+                cell.setData(duration, SORT_ROLE)
+            if camera:
+                cell = self.tree_model.item(row, 7)
+                cell.setText(camera)
+                cell.setData(camera.lower(), SORT_ROLE)
+        self.tree_model.blockSignals(False)
+        if rows:
+            self.tree_model.dataChanged.emit(self.tree_model.index(min(rows), 4),
+                                             self.tree_model.index(max(rows), len(MEDIA_LIST_HEADERS) - 1), [])
+        if self.filter_active():
+            self.apply_filter()
+
+    def filter_bounds(self):
+        def parse(text, end=False):
+            try:
+                day = datetime.strptime(text.strip(), "%Y-%m-%d")
+            except ValueError:
+                return None
+            return day.timestamp() + (86400 if end else 0)
+        return (parse(self.filter_from.text()), parse(self.filter_to.text(), True),
+                self.filter_megapixels.value() * 1e6, self.filter_duration.value())
+
+    def filter_active(self):
+        start, end, pixels, duration = self.filter_bounds()
+        return start is not None or end is not None or pixels > 0 or duration > 0
+
+    def apply_filter(self):
+        """Elemek elrejtése a felvételi dátum, felbontás és hossz alapján (lista és rácsnézet)"""
+        start, end, pixels, duration = self.filter_bounds()
+        active = start is not None or end is not None or pixels > 0 or duration > 0
+        shown = 0
+        for path, item in self.items_by_path.items():
+            visible = True
+            if active:
+                taken, item_pixels, length = self.metadata.get(path, (None, None, None))
+                if (start is not None or end is not None) and not taken:
+                    visible = False
+                elif start is not None and taken < start or end is not None and taken >= end:
+                    visible = False
+                elif pixels > 0 and (not item_pixels or item_pixels < pixels):
+                    visible = False
+                elif duration > 0 and (not length or length < duration):
+                    visible = False
+            self.tree.setRowHidden(item.row(), QModelIndex(), not visible)
+            row = self.grid_model.row_of.get(path)
+            if row is not None:
+                self.grid.setRowHidden(row, not visible)
+            shown += visible
+        if active:
+            self.lbl_status.setText(f"Szűrés: {shown} / {len(self.items_by_path)} fájl")
 
     def preview_media(self):
         """Média előnézet megjelenítése"""
-        selected = self.tree.selectedItems()
+        selected = self.tree.selectionModel().selectedRows()
         if not selected:
             return
             
-        item = selected[0]
-        path = item.data(0, Qt.UserRole)
+        row = selected[0].row()
+        neighbours = []
+        for offset in range(1, PREFETCH_COUNT + 1):
+            for i in (row + offset, row - offset):
+                if 0 <= i < self.tree_model.rowCount() and self.tree_model.item(i, 1).text() == "Kép":
+                    neighbours.append(self.tree_model.item(i, 0).data(Qt.UserRole))
+        self.show_preview(self.tree_model.item(row, 0).data(Qt.UserRole), self.tree_model.item(row, 1).text(), neighbours)
+
+    def preview_grid_item(self, index, previous=None):
+        if index.isValid():
+            row = index.row()
+            path, _, file_type = self.grid_model.rows[row]
+            neighbours = []
+            for offset in range(1, PREFETCH_COUNT + 1):
+                for i in (row + offset, row - offset):
+                    if 0 <= i < len(self.grid_model.rows) and self.grid_model.rows[i][2] == "Kép":
+                        neighbours.append(self.grid_model.rows[i][0])
+            self.show_preview(path, file_type, neighbours)
+
+    def show_preview(self, path, file_type, neighbours=()):
         if not os.path.exists(path):
             QMessageBox.warning(self, "Hiba", "A fájl nem található!")
             return
-            
-        file_type = item.text(1)
         
         self.video_widget.hide()
         self.player.stop()
         self.lbl_status.setText(f"Előnézet: {os.path.basename(path)}")
         
+        self.preview_path = path
+        self.video_preview.hide()
         if file_type == "Kép":
             # Kép megjelenítése az egyedi nézegetőben
             self.image_viewer.display_image(path)
+            self.image_viewer.prefetch(neighbours)
             self.image_viewer.show()
+        elif file_type == "Videó":
+            self.image_viewer.clear()
+            self.image_viewer.hide()
+            self.video_preview.set_loading()
+            self.video_preview.show()
+            self.keyframe_extractor.request(path)
         else:
+            self.image_viewer.show()
             # Egyéb fájltípusok esetén csak állapotsor frissítés
-            self.image_viewer.scene.clear()
+            self.image_viewer.clear()
             self.image_viewer.scene.addText("Kattints duplán a fájl megnyitásához").setDefaultTextColor(Qt.white)
 
-    def delete_files(self):
-        to_delete = []
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            chk = self.tree.itemWidget(item, 3)
-            if chk and chk.isChecked():
-                to_delete.append(item.data(0, Qt.UserRole))
-        
-        if not to_delete:
+    def on_keyframes(self, path, frames):
+        if path == self.preview_path and self.video_preview.isVisible():
+            self.video_preview.set_frames(frames)
+
+    def on_item_changed(self, item):
+        if item.column() != 3:
             return
+        path = self.tree_model.item(item.row(), 0).data(Qt.UserRole)
+        if item.checkState() == Qt.Checked:
+            self.checked_paths.add(path)
+        else:
+            self.checked_paths.discard(path)
+        self.btn_delete.setEnabled(bool(self.checked_paths) and self.delete_worker is None)
+
+    def delete_files(self):
+        self.delete_paths(sorted(self.checked_paths))
 
+    def delete_paths(self, to_delete, on_done=None):
+        """Fájlok törlése megerősítés után háttérszálon; a lista helyben frissül.
+
+        Befejezéskor az on_done a ténylegesen törölt útvonalak halmazát kapja.
+        """
+        if not to_delete or self.delete_worker is not None:
+            return
+        
+        mode = "lomtárba helyezése" if self.use_trash.isChecked() else "végleges törlése"
         # JAVÍTVA: QHeaderView.No helyett QMessageBox.No
         reply = QMessageBox.question(
             self, 
             'Megerősítés',
-            f"{len(to_delete)} fájl törlése?",
+            f"{len(to_delete)} fájl {mode}?",
             QMessageBox.Yes | QMessageBox.No  # Javított sor
         )
+        if reply != QMessageBox.Yes:
+            return
         
-        if reply == QMessageBox.Yes:
-            errors = []
-            for path in to_delete:
-                try:
-                    os.remove(path)
-                except Exception as e:
-                    errors.append(f"{os.path.basename(path)}: {str(e)}")
-            
+        deleted = set()
+        errors = []
+        self.btn_delete.setEnabled(False)
+        self.progress.setVisible(True)
+        self.progress.setValue(0)
+        self.lbl_status.setText(f"Törlés: {len(to_delete)} fájl...")
+        
+        def on_batch(paths):
+            deleted.update(paths)
+            self.remove_from_views(paths)
+        
+        def on_finished():
+            # A QThread.finished után a szál már nem fut, a referencia elengedhető
+            self.delete_worker = None
+            self.progress.setVisible(False)
+            self.btn_delete.setEnabled(bool(self.checked_paths))
+            self.lbl_status.setText(f"{len(deleted)} fájl törölve, {len(self.items_by_path)} médiafájl maradt")
             if errors:
                 error_msg = "\n".join(errors[:5])
                 if len(errors) > 5:
                     error_msg += f"\n... és további {len(errors)-5} hiba"
                 QMessageBox.critical(self, "Hiba", f"{len(errors)} fájl törlése sikertelen:\n{error_msg}")
-            
-            self.load_media()
+            if on_done:
+                on_done(deleted)
+        
+        self.delete_worker = DeleteWorker(list(to_delete), self.use_trash.isChecked())
+        self.delete_worker.progress.connect(self.progress.setValue)
+        self.delete_worker.deleted_batch.connect(on_batch)
+        self.delete_worker.done.connect(errors.extend)
+        self.delete_worker.finished.connect(on_finished)
+        self.delete_worker.start()
+
+    def remove_from_views(self, paths):
+        """Törölt fájlok eltávolítása a listából és a rácsnézetből újraolvasás nélkül"""
+        rows = []
+        for path in paths:
+            item = self.items_by_path.pop(path, None)
+            if item is not None:
+                rows.append(item.row())
+            self.checked_paths.discard(path)
+            self.metadata.pop(path, None)
+            if self.dashboard.columns is not None:
+                self.dashboard.columns.remove(path)
+        if self.preview_path in paths:
+            self.preview_path = None
+            self.player.stop()
+            self.video_widget.hide()
+            self.image_viewer.clear()
+            self.video_preview.hide()
+            self.image_viewer.show()
+        
+        for first, count in contiguous_ranges(rows):
+            self.tree_model.removeRows(first, count)
+        self.grid_model.remove_paths(paths)
+        # Az eltolódott rácssorok elvesztik a rejtett állapotot
+        if self.filter_active():
+            self.apply_filter()
+        if self.dashboard.columns is not None:
+            self.dashboard.invalidate()
+
+    def find_similar_images(self):
+        if np is None:
+            QMessageBox.warning(self, "Hiba", "A hasonló képek kereséséhez a numpy csomag szükséges!")
+            return
+        paths = [self.tree_model.item(row, 0).data(Qt.UserRole)
+                 for row in range(self.tree_model.rowCount())
+                 if self.tree_model.item(row, 1).text() == "Kép"]
+        if len(paths) < 2:
+            QMessageBox.information(self, "Információ", "Legalább két kép szükséges az összehasonlításhoz.")
+            return
+        if self.similar_worker and self.similar_worker.isRunning():
+            return
+        
+        self.btn_similar.setEnabled(False)
+        self.progress.setVisible(True)
+        self.progress.setValue(0)
+        self.similar_worker = SimilarImageWorker(paths, self.similar_distance.value())
+        self.similar_worker.progress.connect(self.progress.setValue)
+        self.similar_worker.status_update.connect(self.lbl_status.setText)
+        self.similar_worker.groups_found.connect(self.show_similar_groups)
+        self.similar_worker.finished.connect(self.on_similar_finished)
+        self.similar_worker.start()
+
+    def on_similar_finished(self):
+        self.btn_similar.setEnabled(True)
+        self.progress.setVisible(False)
+
+    def show_similar_groups(self, groups):
+        if not groups:
+            self.lbl_status.setText("Nincsenek hasonló képek")
+            QMessageBox.information(self, "Információ", "Nem található hasonló kép.")
+            return
+        self.lbl_status.setText(f"{len(groups)} hasonló képcsoport")
+        SimilarImagesDialog(self, groups).exec_()
 
 if __name__ == "__main__":
     import sys
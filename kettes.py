@@ -3,49 +3,807 @@ import re
 import sys
 import subprocess
 import time
-from datetime import datetime
+import html
+import json
+import sqlite3
+import zlib
+import hashlib
+import threading
+import queue
+import mmap
+import codecs
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from datetime import datetime, timedelta
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTreeWidget,
-    QTreeWidgetItem, QFileDialog, QAbstractItemView, QHeaderView,
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTreeView,
+    QFileDialog, QAbstractItemView, QHeaderView, QStyledItemDelegate,
     QLabel, QCheckBox, QMessageBox, QProgressBar, QLineEdit,
-    QFrame, QApplication, QGroupBox
+    QFrame, QApplication, QGroupBox, QComboBox, QSpinBox, QTextEdit, QInputDialog
+)
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QThread, QTimer, QEvent, QRect, QAbstractTableModel, QModelIndex
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QThread
 from docx import Document
-from openpyxl import Workbook
+from exportalo import export_rows
+from adattar import app_data_path, open_database
 from PyPDF2 import PdfReader
 from openpyxl import load_workbook
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from PyQt5.QtGui import QPalette, QColor
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED, CancelledError,
+    TimeoutError as FuturesTimeout
+)
+from PyQt5.QtGui import QPalette, QColor, QPen, QPainter
 
-def read_file_content(file_path):
-    try:
-        file_size = os.path.getsize(file_path)
-        if file_size > 10 * 1024 * 1024:
+PDF_PAGE_SEPARATOR = "\n\f"
+PDF_SPLIT_SIZE = 5 * 1024 * 1024
+PDF_PAGES_PER_TASK = 50
+
+TEXT_CACHE_DIR = app_data_path("szoveg_cache", legacy=".fajlkereso_cache")
+TEXT_CACHE_LIMIT = 512 * 1024 * 1024
+# Emelni kell, ha a tárolt szöveg formátuma megváltozik (pl. PDF oldalelválasztó)
+TEXT_CACHE_VERSION = 3
+DOCUMENT_EXTENSIONS = ('.docx', '.xlsx', '.pdf')
+
+class TextCache:
+    """Kinyert szöveg tömörített lemezes gyorsítótára (path, méret, mtime) kulccsal.
+
+    A bejegyzések módosítási ideje a legutóbbi használat ideje, a méretkorlát
+    túllépésekor a legrégebben használtak törlődnek (LRU).
+    """
+    def __init__(self, folder=TEXT_CACHE_DIR, limit=TEXT_CACHE_LIMIT):
+        self.folder = folder
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.total_size = None
+
+    def entry_path(self, file_path, size, mtime, part=""):
+        """A part a fájl egy részének (pl. PDF oldaltartomány) külön bejegyzést ad"""
+        key = f"{TEXT_CACHE_VERSION}|{os.path.abspath(file_path)}|{size}|{mtime}"
+        if part:
+            key += f"|{part}"
+        return os.path.join(self.folder, hashlib.sha1(key.encode('utf-8', 'surrogatepass')).hexdigest() + ".z")
+
+    def get(self, file_path, size, mtime, part=""):
+        entry = self.entry_path(file_path, size, mtime, part)
+        try:
+            with open(entry, 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+            os.utime(entry, None)
+            return text
+        except (OSError, zlib.error, UnicodeDecodeError):
             return None
-        
-        if file_path.endswith('.docx'):
-            doc = Document(file_path)
-            return "\n".join([para.text for para in doc.paragraphs])
-        elif file_path.endswith('.xlsx'):
+
+    def contains(self, file_path, size, mtime):
+        return os.path.exists(self.entry_path(file_path, size, mtime))
+
+    def put(self, file_path, size, mtime, text, part=""):
+        entry = self.entry_path(file_path, size, mtime, part)
+        data = zlib.compress(text.encode('utf-8', 'replace'), 6)
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, entry)
+        except OSError:
+            return
+        with self.lock:
+            if self.total_size is None:
+                self.total_size = self.scan_size()
+            else:
+                self.total_size += len(data)
+            if self.total_size > self.limit:
+                self.evict()
+
+    def scan_size(self):
+        try:
+            with os.scandir(self.folder) as it:
+                return sum(e.stat().st_size for e in it if e.name.endswith(".z"))
+        except OSError:
+            return 0
+
+    def evict(self):
+        """A legrégebben használt bejegyzések törlése a korlát 90%-áig"""
+        try:
+            with os.scandir(self.folder) as it:
+                entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.name.endswith(".z")]
+        except OSError:
+            return
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.limit * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self.total_size = total
+
+text_cache = TextCache()
+
+def xml_local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def xml_rich_text(elem):
+    """Szöveg egy <si>/<is> elemből (sima <t> vagy formázott <r><t> futamok, fonetika nélkül)"""
+    parts = []
+    for child in elem:
+        name = xml_local_name(child.tag)
+        if name == 't':
+            parts.append(child.text or "")
+        elif name == 'r':
+            parts.extend(t.text or "" for t in child if xml_local_name(t.tag) == 't')
+    return "".join(parts)
+
+def xlsx_sheet_order(name):
+    digits = re.sub(r"\D", "", os.path.basename(name))
+    return int(digits) if digits else 0
+
+def xlsx_sheet_paths(zf, names):
+    """Munkalapok a workbook.xml sorrendjében; ha az nem olvasható, a fájlnév szerint"""
+    sheets = sorted((n for n in names if n.startswith('xl/worksheets/') and n.endswith('.xml')),
+                    key=xlsx_sheet_order)
+    if 'xl/workbook.xml' not in names or 'xl/_rels/workbook.xml.rels' not in names:
+        return sheets
+    targets = {}
+    for elem in ET.fromstring(zf.read('xl/_rels/workbook.xml.rels')):
+        target = elem.get('Target', '')
+        target = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+        targets[elem.get('Id')] = os.path.normpath(target).replace(os.sep, '/')
+    ordered = []
+    for elem in ET.fromstring(zf.read('xl/workbook.xml')).iter():
+        if xml_local_name(elem.tag) == 'sheet':
+            rel_id = next((v for k, v in elem.attrib.items() if xml_local_name(k) == 'id'), None)
+            if targets.get(rel_id) in names:
+                ordered.append(targets[rel_id])
+    return ordered or sheets
+
+def xlsx_date1904(zf, names):
+    if 'xl/workbook.xml' not in names:
+        return False
+    for elem in ET.fromstring(zf.read('xl/workbook.xml')).iter():
+        if xml_local_name(elem.tag) == 'workbookPr':
+            return elem.get('date1904') in ('1', 'true')
+    return False
+
+# Beépített dátum/idő számformátumok azonosítói
+XLSX_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+XLSX_FORMAT_STRIP_RE = re.compile(r'"[^"]*"|\\.|\[(?!h+\]|m+\]|s+\])[^\]]*\]')
+
+def xlsx_is_date_format(code):
+    """A számformátum dátumot/időt ír-e ki (idézett szöveg, [szín] és [$-pénznem] nélkül)"""
+    code = XLSX_FORMAT_STRIP_RE.sub("", code.split(';')[0]).lower()
+    return bool(re.search(r"[dmyhs]", code))
+
+def xlsx_date_styles(zf, names):
+    """A dátumformátumú cellastílusok (cellXfs indexek) halmaza"""
+    if 'xl/styles.xml' not in names:
+        return set()
+    root = ET.fromstring(zf.read('xl/styles.xml'))
+    custom = {}
+    date_styles = set()
+    for elem in root:
+        tag = xml_local_name(elem.tag)
+        if tag == 'numFmts':
+            for fmt in elem:
+                custom[int(fmt.get('numFmtId', -1))] = fmt.get('formatCode', '')
+        elif tag == 'cellXfs':
+            for index, xf in enumerate(elem):
+                fmt_id = int(xf.get('numFmtId', 0))
+                if fmt_id in custom:
+                    if xlsx_is_date_format(custom[fmt_id]):
+                        date_styles.add(index)
+                elif fmt_id in XLSX_BUILTIN_DATE_FORMATS:
+                    date_styles.add(index)
+    return date_styles
+
+def excel_serial_text(value, date1904=False):
+    """Excel dátumsorszám szövegként, ahogy az openpyxl is adná (2024-03-15 00:00:00)"""
+    serial = float(value)
+    if date1904:
+        base = datetime(1904, 1, 1)
+    elif serial < 60:
+        base = datetime(1899, 12, 31)  # az 1900-as szökőnap-hiba előtti napok
+    else:
+        base = datetime(1899, 12, 30)
+    if 0 <= serial < 1:
+        return str((datetime.min + timedelta(seconds=round(serial * 86400))).time())
+    return str(base + timedelta(seconds=round(serial * 86400)))
+
+def iter_xlsx_rows(file_path):
+    """Az összes munkalap sorai szövegként, a munkalap XML-ből streamelve.
+
+    Csak a megosztott szövegtábla kerül teljes egészében memóriába; a sorok
+    feldolgozás után törlődnek. A dátumformátumú és logikai cellák az
+    openpyxl-lel azonos szöveget adnak. Ha a megszokott belső szerkezet
+    hiányzik, openpyxl read-only módra vált.
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        names = set(zf.namelist())
+        sheets = xlsx_sheet_paths(zf, names)
+        if not sheets:
             wb = load_workbook(file_path, read_only=True)
-            sheet = wb.active
-            content = ""
-            for row in sheet.iter_rows(values_only=True):
-                content += " ".join(str(cell) for cell in row if cell) + "\n"
-            return content
-        elif file_path.endswith('.pdf'):
-            reader = PdfReader(file_path)
-            content = ""
-            for page in reader.pages:
-                content += page.extract_text() + "\n"
-            return content
-        else:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                return file.read()
-    except Exception as e:
-        print(f"Hiba történt a fájl olvasása közben: {e}")
+            try:
+                for sheet in wb.worksheets:
+                    for row in sheet.iter_rows(values_only=True):
+                        cells = [str(cell) for cell in row if cell is not None]
+                        if cells:
+                            yield " ".join(cells)
+            finally:
+                wb.close()
+            return
+        
+        shared = []
+        if 'xl/sharedStrings.xml' in names:
+            with zf.open('xl/sharedStrings.xml') as f:
+                for _, elem in ET.iterparse(f):
+                    if xml_local_name(elem.tag) == 'si':
+                        shared.append(xml_rich_text(elem))
+                        elem.clear()
+        date_styles = xlsx_date_styles(zf, names)
+        date1904 = xlsx_date1904(zf, names)
+        
+        for name in sheets:
+            with zf.open(name) as f:
+                cells = []
+                cell_type = None
+                is_date = False
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    tag = xml_local_name(elem.tag)
+                    if event == 'start':
+                        if tag == 'c':
+                            cell_type = elem.get('t')
+                            is_date = int(elem.get('s', 0)) in date_styles
+                        continue
+                    if tag == 'v':
+                        value = elem.text
+                        if not value:
+                            continue
+                        if cell_type == 's':
+                            index = int(value)
+                            if 0 <= index < len(shared):
+                                cells.append(shared[index])
+                        elif cell_type == 'b':
+                            cells.append("True" if value == '1' else "False")
+                        elif cell_type in (None, 'n') and is_date:
+                            try:
+                                cells.append(excel_serial_text(value, date1904))
+                            except (ValueError, OverflowError):
+                                cells.append(value)
+                        else:
+                            cells.append(value)
+                    elif tag == 'is':
+                        cells.append(xml_rich_text(elem))
+                    elif tag == 'row':
+                        if cells:
+                            yield " ".join(cells)
+                        cells = []
+                        elem.clear()
+
+def extract_document_text(file_path):
+    if file_path.endswith('.docx'):
+        doc = Document(file_path)
+        return "\n".join([para.text for para in doc.paragraphs])
+    elif file_path.endswith('.xlsx'):
+        return "\n".join(iter_xlsx_rows(file_path))
+    else:
+        # Az oldalakat lapdobás választja el, így a gyorsítótárból is oldalanként kereshető
+        reader = PdfReader(file_path)
+        return PDF_PAGE_SEPARATOR.join((page.extract_text() or "") for page in reader.pages)
+
+def read_file_content(file_path):
+    """A fájl szövege (10 MB felett None). Olvasási vagy kinyerési hibánál kivételt
+    dob, hogy a hívó ne kezelje üres, találat nélküli fájlként"""
+    st = os.stat(file_path)
+    file_size = st.st_size
+    if file_size > 10 * 1024 * 1024:
         return None
+    
+    if file_path.endswith(DOCUMENT_EXTENSIONS):
+        content = text_cache.get(file_path, file_size, st.st_mtime)
+        if content is None:
+            content = extract_document_text(file_path)
+            text_cache.put(file_path, file_size, st.st_mtime, content)
+        return content
+    else:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+            return file.read()
+
+QUERY_LITERAL = 0
+QUERY_TERMS = 1
+QUERY_REGEX = 2
+
+SNIPPET_LIMIT = 5
+SNIPPET_CONTEXT = 40
+SNIPPET_WHITESPACE = str.maketrans("\r\n\t\f\v", "     ")
+
+def make_snippet(text, start, end, label):
+    """Rövid környezet egy találat körül: (hely, szöveg, találat kezdete, hossza)"""
+    a = max(0, start - SNIPPET_CONTEXT)
+    b = min(len(text), end + SNIPPET_CONTEXT)
+    return (label, text[a:b].translate(SNIPPET_WHITESPACE), start - a, end - start)
+
+class SearchQuery:
+    """Keresési kifejezés: egy szöveg, több kifejezés ÉS/VAGY/NEM kapcsolattal, vagy regex.
+
+    Több kifejezés esetén egyetlen összevont alternációt fordít, így egy
+    fájlon egyetlen menetben számolja meg az összes kifejezés találatait.
+    A '-' előtagú kifejezés kizáró (NEM) feltétel.
+    """
+    def __init__(self, text, mode=QUERY_LITERAL, case_sensitive=False, require_all=False, match_limit=0):
+        self.require_all = require_all
+        self.match_limit = match_limit
+        flags = 0 if case_sensitive else re.IGNORECASE
+        if mode == QUERY_TERMS:
+            terms = [t.strip() for t in re.split(r"[;\n]", text) if t.strip()]
+            self.negated = [t.startswith("-") and len(t) > 1 for t in terms]
+            terms = [t[1:] if neg else t for t, neg in zip(terms, self.negated)]
+        else:
+            terms = [text]
+            self.negated = [False]
+        self.terms = terms
+        if mode == QUERY_REGEX:
+            self.pattern = re.compile(text, flags)
+            self.groups = None
+            self.max_match_len = 4096
+        else:
+            # Leghosszabb kifejezés előre, hogy az alternáció a hosszabb egyezést válassza
+            order = sorted(range(len(terms)), key=lambda i: len(terms[i]), reverse=True)
+            self.pattern = re.compile("|".join(f"({re.escape(terms[i])})" for i in order), flags)
+            self.groups = order
+            self.max_match_len = max(max((len(t) for t in terms), default=1) * 4, 256)
+
+    def term_index(self, match):
+        return self.groups[match.lastindex - 1] if self.groups else 0
+
+    def new_counts(self):
+        return [0] * len(self.terms)
+
+    def count_text(self, text, counts=None, snippets=None, label=None, offset=0):
+        """Találatok számolása; ha snippets lista is érkezik, legfeljebb SNIPPET_LIMIT
+        találat környezetét is rögzíti ugyanebben a menetben"""
+        if counts is None:
+            counts = self.new_counts()
+        for m in self.pattern.finditer(text):
+            idx = self.term_index(m)
+            counts[idx] += 1
+            if snippets is not None and len(snippets) < SNIPPET_LIMIT and not self.negated[idx]:
+                snippets.append(make_snippet(text, m.start(), m.end(),
+                                             label or f"{offset + m.start() + 1}. karakter"))
+        return counts
+
+    def evaluate(self, counts):
+        """Az ÉS/VAGY/NEM feltételek kiértékelése; a találatszám, vagy 0 ha nem teljesül"""
+        positive = [c for c, neg in zip(counts, self.negated) if not neg]
+        if any(c for c, neg in zip(counts, self.negated) if neg):
+            return 0
+        if not positive:
+            # Csak kizáró feltétel: minden fájl találat, amelyben egyik sem szerepel
+            return 1
+        if self.require_all and not all(positive):
+            return 0
+        return sum(positive)
+
+    def matches_name(self, name):
+        return self.evaluate(self.count_text(name)) > 0
+
+    def can_stop(self, counts):
+        """Eldől-e már az eredmény: kizáró kifejezés előfordult, vagy elértük a találatkorlátot"""
+        if any(c for c, neg in zip(counts, self.negated) if neg):
+            return True
+        if not self.match_limit or all(self.negated):
+            return False
+        return self.evaluate(counts) >= self.match_limit
+
+TEXT_CHUNK_SIZE = 4 * 1024 * 1024
+# E méret fölött csak a szövegesnek ismert vagy annak látszó fájlok tartalma kerül beolvasásra
+TEXT_SIZE_LIMIT = 10 * 1024 * 1024
+TEXT_SNIFF_BYTES = 8192
+TEXT_EXTENSIONS = (
+    ".txt", ".log", ".csv", ".tsv", ".json", ".xml", ".html", ".htm", ".md", ".ini",
+    ".cfg", ".conf", ".yaml", ".yml", ".sql", ".py", ".js", ".css", ".c", ".h",
+    ".cpp", ".java", ".cs", ".php", ".sh", ".bat", ".ps1", ".srt", ".rtf"
+)
+
+def is_text_content(file_path, file_size):
+    """Beolvasható-e a (nem dokumentum) fájl tartalma szövegként.
+
+    10 MB-ig minden fájl, felette csak az ismert szöveges kiterjesztések és azok
+    a fájlok, amelyek első blokkjában nincs NUL bájt (UTF-16 BOM kivételével);
+    a nagy videók, lemezképek és archívumok így csak fájlnévre illeszkednek.
+    """
+    if file_size <= TEXT_SIZE_LIMIT or file_path.lower().endswith(TEXT_EXTENSIONS):
+        return True
+    with open(file_path, 'rb') as f:
+        head = f.read(TEXT_SNIFF_BYTES)
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return True
+    return b'\0' not in head
+
+def detect_encoding(head, file_size=None):
+    """Kódolás felismerése a fájl elejéből: BOM, majd UTF-8 próba, végül cp1250.
+
+    A file_size alapján dönthető el, hogy a minta a fájl egésze-e: csak a
+    levágott minta végén lehet félbemaradt (hibátlan) UTF-8 karakter.
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A minta végén félbevágott többbájtos karakter nem számít hibának
+        truncated = file_size is None or len(head) < file_size
+        if truncated and e.reason == 'unexpected end of data':
+            return 'utf-8'
+    return 'cp1250'
+
+def iter_text_file(file_path):
+    """Szöveges fájl dekódolt blokkjai (szöveg, utolsó-e) mmap-pel, méretkorlát nélkül"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding = detect_encoding(mm[:65536], len(mm))
+            decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+            size = len(mm)
+            for offset in range(0, size, TEXT_CHUNK_SIZE):
+                final = offset + TEXT_CHUNK_SIZE >= size
+                yield decoder.decode(mm[offset:offset + TEXT_CHUNK_SIZE], final), final
+
+def count_text_file_matches(file_path, query, snippets=None):
+    """Szöveges fájl találatainak megszámolása mmap-pel, blokkonként.
+
+    A blokkhatáron átnyúló találatok miatt minden blokk végéből max_match_len
+    karakter átkerül a következőbe; a már megszámolt találatokkal átfedő
+    egyezéseket kihagyja, így az eredmény megegyezik a teljes szövegen
+    futtatott finditer-rel. Kifejezésenkénti találatszámokat ad vissza, a
+    snippets listába pedig az első találatok környezetét gyűjti.
+    """
+    counts = query.new_counts()
+    carry = ""
+    skip = 0
+    text_start = 0  # a blokk szövegének első karaktere hányadik a fájlban
+    for chunk, final in iter_text_file(file_path):
+        text = carry + chunk
+        limit = len(text) if final else max(0, len(text) - query.max_match_len)
+        for m in query.pattern.finditer(text, skip):
+            if m.start() >= limit:
+                break
+            idx = query.term_index(m)
+            counts[idx] += 1
+            if snippets is not None and len(snippets) < SNIPPET_LIMIT and not query.negated[idx]:
+                snippets.append(make_snippet(text, m.start(), m.end(),
+                                             f"{text_start + m.start() + 1}. karakter"))
+            skip = m.end() if m.end() > m.start() else m.end() + 1
+        carry = text[limit:]
+        skip = max(0, skip - limit)
+        text_start += limit
+        if query.can_stop(counts):
+            break
+    return counts
+
+def count_xlsx_matches(file_path, query, snippets=None):
+    """Munkafüzet keresése soronként, a találatkorlát elérésekor korai kilépéssel"""
+    st = os.stat(file_path)
+    content = text_cache.get(file_path, st.st_size, st.st_mtime)
+    counts = query.new_counts()
+    if content is not None:
+        for row_no, row in enumerate(content.split("\n"), 1):
+            query.count_text(row, counts, snippets, f"{row_no}. sor")
+            if query.can_stop(counts):
+                break
+        return counts
+    # Kisebb fájlok teljes szövege a gyorsítótárba kerül, ha végigolvastuk
+    rows = [] if st.st_size <= 10 * 1024 * 1024 else None
+    for row_no, row in enumerate(iter_xlsx_rows(file_path), 1):
+        query.count_text(row, counts, snippets, f"{row_no}. sor")
+        if query.can_stop(counts):
+            return counts
+        if rows is not None:
+            rows.append(row)
+    if rows is not None:
+        text_cache.put(file_path, st.st_size, st.st_mtime, "\n".join(rows))
+    return counts
+
+def pdf_page_count(file_path):
+    return len(PdfReader(file_path).pages)
+
+def add_pdf_page(query, page_no, text, counts, page_hits, snippets):
+    page_counts = query.count_text(text, snippets=snippets, label=f"{page_no}. oldal")
+    hits = sum(c for c, neg in zip(page_counts, query.negated) if not neg)
+    if hits:
+        page_hits[page_no] = hits
+    for i, c in enumerate(page_counts):
+        counts[i] += c
+
+def count_pdf_range(file_path, query, first_page=0, last_page=None):
+    """PDF oldaltartományának (alapból a teljes fájlnak) keresése, korai kilépéssel.
+
+    Visszaadja a kifejezésenkénti találatszámokat, az oldalankénti
+    találatokat ({oldalszám: találat}, 1-től számozva) és az első találatok
+    környezetét. A végigolvasott tartomány szövege itt, a feldolgozó
+    folyamatban kerül a gyorsítótárba (tartományonként külön kulccsal), így a
+    szülőfolyamatba csak a számok jutnak vissza.
+    """
+    st = os.stat(file_path)
+    part = "" if first_page == 0 and last_page is None else f"{first_page}-{last_page}"
+    counts = query.new_counts()
+    page_hits = {}
+    snippets = []
+    cached = text_cache.get(file_path, st.st_size, st.st_mtime, part)
+    if cached is not None:
+        for page_no, text in enumerate(cached.split(PDF_PAGE_SEPARATOR), first_page + 1):
+            add_pdf_page(query, page_no, text, counts, page_hits, snippets)
+            if query.can_stop(counts):
+                break
+        return counts, page_hits, snippets
+    
+    pages = PdfReader(file_path).pages
+    last = len(pages) if last_page is None else min(last_page, len(pages))
+    texts = []
+    for i in range(first_page, last):
+        text = pages[i].extract_text() or ""
+        add_pdf_page(query, i + 1, text, counts, page_hits, snippets)
+        if query.can_stop(counts):
+            # Hiányos szöveg, nem gyorsítótárazható
+            return counts, page_hits, snippets
+        texts.append(text)
+    text_cache.put(file_path, st.st_size, st.st_mtime, PDF_PAGE_SEPARATOR.join(texts), part)
+    return counts, page_hits, snippets
+
+def count_pdf_matches(file_path, query):
+    """PDF keresése oldalanként, a teljes fájl gyorsítótár-bejegyzésével"""
+    return count_pdf_range(file_path, query)
+
+def format_page_hits(page_hits, max_pages=10):
+    """Oldalankénti találatok rövid szöveges formája, pl. "1 (3), 5 (1)" """
+    pages = sorted(page_hits)
+    text = ", ".join(f"{p} ({page_hits[p]})" for p in pages[:max_pages])
+    if len(pages) > max_pages:
+        text += f", ... (+{len(pages) - max_pages} oldal)"
+    return text
+
+def count_document_matches(file_path, query):
+    """Külön folyamatban fut: csak a találatszámokat, PDF-nél az oldalankénti
+    találatokat és néhány rövid környezetet ad vissza, nem a teljes szöveget"""
+    snippets = []
+    if file_path.endswith('.xlsx'):
+        return count_xlsx_matches(file_path, query, snippets), None, snippets
+    if file_path.endswith('.pdf'):
+        return count_pdf_matches(file_path, query)
+    content = read_file_content(file_path)
+    if not content:
+        return query.new_counts(), None, snippets
+    return query.count_text(content, snippets=snippets), None, snippets
+
+INDEX_PATH = app_data_path("tartalom_index.sqlite", legacy=".fajlkereso_index.sqlite")
+# Emelni kell, ha a szótagolás vagy a szövegkinyerés megváltozik (az index újraépül)
+INDEX_VERSION = 1
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text):
+    return Counter(t.lower() for t in TOKEN_RE.findall(text))
+
+def query_terms(pattern):
+    """A keresőkifejezés szavai az indexeléssel azonos szótagolással és kisbetűsítéssel.
+
+    A '*' végű szó utolsó tagja előtagként illeszkedik ("INV-00*" -> inv, 00*).
+    """
+    terms = []
+    for word in pattern.split():
+        tokens = [t.lower() for t in TOKEN_RE.findall(word)]
+        if tokens and word.endswith("*"):
+            tokens[-1] += "*"
+        terms.extend(tokens)
+    return terms
+
+def index_file_tokens(file_path):
+    """Egy fájl szavai az indexhez: a dokumentumok a (gyorsítótárazott) kinyert
+    szövegből, a szöveges fájlok mmap-pel blokkonként, méretkorlát nélkül.
+    A nagy bináris fájlok (lásd is_text_content) szavak nélkül kerülnek az indexbe."""
+    st = os.stat(file_path)
+    if file_path.endswith(DOCUMENT_EXTENSIONS):
+        content = text_cache.get(file_path, st.st_size, st.st_mtime)
+        if content is None:
+            content = extract_document_text(file_path)
+            text_cache.put(file_path, st.st_size, st.st_mtime, content)
+        return tokenize(content)
+    tokens = Counter()
+    if not is_text_content(file_path, st.st_size):
+        return tokens
+    carry = ""
+    for chunk, final in iter_text_file(file_path):
+        text = carry + chunk
+        # A blokk végén félbevágott szó a következő blokkal együtt számít
+        cut = len(text)
+        if not final:
+            while cut > 0 and (text[cut - 1].isalnum() or text[cut - 1] == "_"):
+                cut -= 1
+            if cut == 0:
+                cut = len(text)
+        tokens.update(t.lower() for t in TOKEN_RE.findall(text, 0, cut))
+        carry = text[cut:]
+    return tokens
+
+class ContentIndex:
+    """Lemezen tárolt (SQLite) invertált index: szó -> (fájl, előfordulás).
+
+    A fájlokat útvonal + méret + módosítási idő azonosítja, így újraindexeléskor
+    csak a megváltozott fájlok tartalmát kell újra kinyerni.
+    """
+    def __init__(self, path=INDEX_PATH):
+        self.conn = open_database(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                token TEXT NOT NULL,
+                file_id INTEGER NOT NULL,
+                cnt INTEGER NOT NULL,
+                PRIMARY KEY (token, file_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_file ON postings(file_id);
+        """)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def known_files(self, folder):
+        """A mappa alatt indexelt fájlok: útvonal -> (id, méret, mtime)"""
+        prefix = os.path.join(folder, "")
+        rows = self.conn.execute(
+            "SELECT path, id, size, mtime FROM files WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix))
+        return {path: (file_id, size, mtime) for path, file_id, size, mtime in rows}
+
+    def remove_file(self, file_id):
+        self.conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def store_file(self, path, size, mtime, tokens):
+        row = self.conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            self.remove_file(row[0])
+        cur = self.conn.execute("INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)",
+                                (path, size, mtime))
+        file_id = cur.lastrowid
+        self.conn.executemany("INSERT INTO postings (token, file_id, cnt) VALUES (?, ?, ?)",
+                              ((tok, file_id, cnt) for tok, cnt in tokens.items()))
+
+    def commit(self):
+        self.conn.commit()
+
+    def query(self, folder, terms):
+        """Fájlok, amelyek minden keresett szót tartalmaznak: útvonal -> találatszám.
+
+        A '*' végű szó előtagként illeszkedik. A találatszám a szavak
+        előfordulásainak minimuma.
+        """
+        prefix = os.path.join(folder, "")
+        result = None
+        for term in terms:
+            if term.endswith("*"):
+                stem = term[:-1]
+                rows = self.conn.execute(
+                    "SELECT f.path, SUM(p.cnt) FROM postings p JOIN files f ON f.id = p.file_id "
+                    "WHERE p.token >= ? AND p.token < ? AND substr(f.path, 1, ?) = ? GROUP BY f.path",
+                    (stem, stem + "\U0010ffff", len(prefix), prefix))
+            else:
+                rows = self.conn.execute(
+                    "SELECT f.path, p.cnt FROM postings p JOIN files f ON f.id = p.file_id "
+                    "WHERE p.token = ? AND substr(f.path, 1, ?) = ?",
+                    (term, len(prefix), prefix))
+            counts = dict(rows)
+            if result is None:
+                result = counts
+            else:
+                result = {path: min(cnt, counts[path]) for path, cnt in result.items() if path in counts}
+            if not result:
+                break
+        return result or {}
+
+SAVED_SEARCH_PATH = app_data_path("mentett_keresesek.sqlite", legacy=".fajlkereso_mentett.sqlite")
+
+class SavedSearchStore:
+    """Mentett keresések (SQLite): a beállítások és fájlonként az utolsó eredmény.
+
+    Minden megvizsgált fájl (a találat nélküliek is) a méret + módosítási idő
+    ujjlenyomattal kerül tárolásra, így újrafuttatáskor csak az új vagy
+    megváltozott fájlokat kell újra megnyitni.
+    """
+    def __init__(self, path=SAVED_SEARCH_PATH):
+        self.conn = open_database(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS searches (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                definition TEXT NOT NULL,
+                last_run REAL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                search_id INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                cnt INTEGER NOT NULL,
+                location TEXT NOT NULL,
+                snippets TEXT,
+                PRIMARY KEY (search_id, path)
+            ) WITHOUT ROWID;
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def names(self):
+        return [name for (name,) in self.conn.execute("SELECT name FROM searches ORDER BY name")]
+
+    def definition(self, name):
+        row = self.conn.execute("SELECT definition FROM searches WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, name, definition):
+        """A keresés mentése; ha a beállítások változtak, a tárolt eredmények elvesznek.
+
+        A mentett keresés azonosítóját adja vissza.
+        """
+        text = json.dumps(definition, sort_keys=True)
+        row = self.conn.execute("SELECT id, definition FROM searches WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            search_id = self.conn.execute("INSERT INTO searches (name, definition) VALUES (?, ?)",
+                                          (name, text)).lastrowid
+        else:
+            search_id = row[0]
+            if row[1] != text:
+                self.conn.execute("DELETE FROM results WHERE search_id = ?", (search_id,))
+                self.conn.execute("UPDATE searches SET definition = ?, last_run = NULL WHERE id = ?",
+                                  (text, search_id))
+        self.conn.commit()
+        return search_id
+
+    def delete(self, name):
+        row = self.conn.execute("SELECT id FROM searches WHERE name = ?", (name,)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM results WHERE search_id = ?", (row[0],))
+            self.conn.execute("DELETE FROM searches WHERE id = ?", (row[0],))
+            self.conn.commit()
+
+    def results(self, search_id):
+        """Az előző futás eredményei: útvonal -> (méret, mtime, találatszám, oldalak, környezetek JSON)"""
+        rows = self.conn.execute(
+            "SELECT path, size, mtime, cnt, location, snippets FROM results WHERE search_id = ?",
+            (search_id,))
+        return {path: (size, mtime, cnt, location, snippets)
+                for path, size, mtime, cnt, location, snippets in rows}
+
+    def update_results(self, search_id, changed, removed=()):
+        """Az újravizsgált fájlok eredményeinek felülírása és az eltűnt fájlok törlése"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO results (search_id, path, size, mtime, cnt, location, snippets) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((search_id, path, size, mtime, cnt, location, json.dumps(snippets) if snippets else None)
+             for path, (size, mtime, cnt, location, snippets) in changed.items()))
+        self.conn.executemany("DELETE FROM results WHERE search_id = ? AND path = ?",
+                              ((search_id, path) for path in removed))
+        self.conn.execute("UPDATE searches SET last_run = ? WHERE id = ?", (time.time(), search_id))
+        self.conn.commit()
 
 def open_with_application(file_path):
     normalized_path = os.path.normpath(file_path)
@@ -63,14 +821,45 @@ def open_with_application(file_path):
         elif os.name == 'posix':
             subprocess.Popen(["xdg-open", normalized_path])
 
+STOP_POLL_INTERVAL = 0.2
+
+def wait_future(future, is_stopped):
+    """Egy pool-feladat eredménye; leállításkor nem várja meg a már futó feladatot
+    (CancelledError), így a hívó szál azonnal továbbléphet"""
+    while True:
+        try:
+            return future.result(timeout=STOP_POLL_INTERVAL)
+        except FuturesTimeout:
+            if is_stopped():
+                future.cancel()
+                raise CancelledError()
+
+def iter_completed(futures, is_stopped):
+    """as_completed leállításfigyeléssel: akkor is kilép, ha épp egyik feladat sem végez"""
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+        yield from done
+        if is_stopped():
+            return
+
 class SearchWorker(QThread):
     update_progress = pyqtSignal(int, int, int, float)
-    file_found_single = pyqtSignal(str, int)
+    file_found_single = pyqtSignal(str, int, str, list)  # útvonal, találatszám, oldalak, környezetek
     search_finished = pyqtSignal()
     status_update = pyqtSignal(str)
 
+    EXCLUDED_EXTENSIONS = [
+        ".exe", ".mp3", ".mp4", ".wav", ".jpg", ".jpeg", ".png", ".gif", ".bmp",
+        ".tiff", ".psd", ".avi", ".mov", ".mkv", ".flv", ".wmv", ".flac", ".aac",
+        ".ogg", ".wma", ".zip", ".rar", ".7z", ".tar", ".gz", ".bin", ".iso", ".dll",
+        ".so", ".ttf", ".otf", ".woff", ".cbr", ".cbz", ".epub", ".mobi", ".db", ".sqlite",
+        ".mdb", ".sys", ".msi", ".cab"
+    ]
+
     def __init__(self, folder, pattern, exact_match, exclude_extensions, 
-                 search_filenames_only, search_folders_only, start_date, end_date):
+                 search_filenames_only, search_folders_only, start_date, end_date,
+                 query_mode=QUERY_LITERAL, require_all=False, match_limit=0, saved_search_id=None):
         super().__init__()
         self.folder = folder
         self.pattern = pattern
@@ -82,129 +871,502 @@ class SearchWorker(QThread):
         self.end_date = end_date
         self.stop_flag = False
         
-        # JAVÍTÁS: re.escape() biztosítja, hogy a $, [, ] karakterek szó szerint kerüljenek keresésre
-        escaped_pattern = re.escape(pattern)
-        self.compiled_pattern = re.compile(escaped_pattern, re.IGNORECASE if not exact_match else 0)
+        # Szöveges módban a kifejezések re.escape()-pel, szó szerint kerülnek keresésre;
+        # hibás reguláris kifejezésnél re.error keletkezik
+        self.query = SearchQuery(pattern, query_mode, exact_match, require_all, match_limit)
         
-        self.excluded_extensions = [
-            ".exe", ".mp3", ".mp4", ".wav", ".jpg", ".jpeg", ".png", ".gif", ".bmp",
-            ".tiff", ".psd", ".avi", ".mov", ".mkv", ".flv", ".wmv", ".flac", ".aac",
-            ".ogg", ".wma", ".zip", ".rar", ".7z", ".tar", ".gz", ".bin", ".iso", ".dll",
-            ".so", ".ttf", ".otf", ".woff", ".cbr", ".cbz", ".epub", ".mobi", ".db", ".sqlite",
-            ".mdb", ".sys", ".msi", ".cab"
-        ]
+        self.excluded_extensions = self.EXCLUDED_EXTENSIONS
+        self.excluded_suffixes = tuple(self.EXCLUDED_EXTENSIONS)
+        self.content_search = not (search_filenames_only or search_folders_only)
+        # Mentett keresésnél a változatlan fájlok eredménye az előző futásból jön
+        self.saved_search_id = saved_search_id if self.content_search else None
+        # Dátumhatárok időbélyegként: a létrehozási idő közvetlenül összevethető
+        self.start_ts = datetime.combine(start_date, datetime.min.time()).timestamp() if start_date else None
+        self.end_ts = (datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)).timestamp() \
+            if end_date else None
 
     def run(self):
         try:
-            self.status_update.emit("Fájlok listázása...")
-            file_list = []
-            total_files = 0
-            
-            for entry in os.scandir(self.folder):
-                if self.stop_flag:
-                    return
-                    
-                if entry.is_dir(follow_symlinks=False):
-                    for root, dirs, files in os.walk(entry.path):
-                        if self.stop_flag:
-                            return
-                        if self.search_folders_only:
-                            items = dirs
-                        else:
-                            items = files
-                        for item in items:
-                            file_list.append(os.path.join(root, item))
-                            total_files += 1
-                else:
-                    file_list.append(entry.path)
-                    total_files += 1
-            
-            if total_files == 0:
-                self.search_finished.emit()
-                return
-                
+            self.status_update.emit("Fájlok listázása és keresés...")
             processed_files = 0
             found_files = 0
+            total_files = 0
+            listing_done = False
             start_time = time.time()
             
             num_workers = max(1, os.cpu_count() - 1)
-            batch_size = min(100, max(10, total_files // 100))
+            batch_size = 100
+            # Korlátos sor: a listázás legfeljebb ennyivel járhat a feldolgozás előtt
+            file_queue = queue.Queue(maxsize=num_workers * 64)
+            counter_lock = threading.Lock()
             
-            def process_file(file_path):
+            store = None
+            previous = None
+            changed = {}
+            seen = set()
+            reused_files = 0
+            if self.saved_search_id is not None:
+                store = SavedSearchStore()
+                previous = store.results(self.saved_search_id)
+            
+            def process_file(candidate):
+                # A dátum- és kiterjesztésszűrés már a listázáskor megtörtént
+                file_path, file_size, file_mtime = candidate
                 if self.stop_flag:
                     return (file_path, 0)
                 
                 item_name = os.path.basename(file_path)
                 match_count = 0
-                
-                if self.start_date or self.end_date:
-                    try:
-                        creation_time = os.path.getctime(file_path)
-                        creation_date = datetime.fromtimestamp(creation_time).date()
-                        if self.start_date and creation_date < self.start_date:
-                            return (file_path, 0)
-                        if self.end_date and creation_date > self.end_date:
-                            return (file_path, 0)
-                    except:
-                        pass
-                
-                if self.exclude_extensions and not self.search_folders_only:
-                    if any(item_name.lower().endswith(ext) for ext in self.excluded_extensions):
-                        return (file_path, 0)
+                location = ""
+                snippets = []
+                failed = False
                 
                 if self.search_filenames_only or self.search_folders_only:
-                    if self.compiled_pattern.search(item_name):
+                    if self.query.matches_name(item_name):
                         match_count = 1
                 else:
                     try:
-                        file_size = os.path.getsize(file_path)
-                        if file_size > 10 * 1024 * 1024:
-                            if self.compiled_pattern.search(item_name):
+                        if not file_path.endswith(DOCUMENT_EXTENSIONS):
+                            if is_text_content(file_path, file_size):
+                                # Szöveges fájl: méretkorlát nélkül, a tartalom memóriába töltése nélkül
+                                match_count = self.query.evaluate(
+                                    count_text_file_matches(file_path, self.query, snippets))
+                            elif self.query.matches_name(item_name):
                                 match_count = 1
+                        elif file_path.endswith('.docx') and file_size > 10 * 1024 * 1024:
+                            if self.query.matches_name(item_name):
+                                match_count = 1
+                        elif file_path.endswith('.pdf') and file_size > PDF_SPLIT_SIZE:
+                            counts, page_hits, snippets = self.search_pdf_parallel(file_path, doc_executor)
+                            match_count = self.query.evaluate(counts)
+                            location = format_page_hits(page_hits)
                         else:
-                            content = read_file_content(file_path)
-                            if content:
-                                match_count = len(self.compiled_pattern.findall(content))
+                            # CPU-igényes feldolgozás a process poolban, a GIL megkerülésével
+                            counts, page_hits, snippets = wait_future(doc_executor.submit(
+                                count_document_matches, file_path, self.query), self.is_stopped)
+                            match_count = self.query.evaluate(counts)
+                            if page_hits:
+                                location = format_page_hits(page_hits)
                     except:
-                        if self.compiled_pattern.search(item_name):
+                        failed = True
+                        if not self.stop_flag and self.query.matches_name(item_name):
                             match_count = 1
                 
                 if match_count > 0:
-                    self.file_found_single.emit(file_path, match_count)
+                    self.file_found_single.emit(file_path, match_count, location, snippets)
+                # Hibás olvasás eredménye nem kerül tárolásra, a következő futás újrapróbálja
+                if previous is not None and not self.stop_flag and not failed:
+                    with counter_lock:
+                        changed[file_path] = (file_size, file_mtime, match_count, location, snippets)
                 return (file_path, match_count)
             
-            with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                futures = [executor.submit(process_file, fp) for fp in file_list]
-                
-                for future in as_completed(futures):
+            def consumer():
+                nonlocal processed_files, found_files
+                while True:
+                    candidate = file_queue.get()
+                    if candidate is None:
+                        return
                     if self.stop_flag:
-                        for f in futures:
-                            f.cancel()
-                        break
-                        
-                    file_path, match_count = future.result()
-                    processed_files += 1
+                        # Leállításkor csak kiürítjük a sort, hogy a listázó ne akadjon el
+                        continue
                     
+                    try:
+                        _, match_count = process_file(candidate)
+                    except Exception:
+                        # Egy hibás fájl nem állíthatja le a fogyasztót, különben a sor megtelne
+                        match_count = 0
+                    with counter_lock:
+                        processed_files += 1
+                        if match_count > 0:
+                            found_files += 1
+                        processed, found, total = processed_files, found_files, total_files
+                        done = listing_done
+                    if processed % batch_size == 0 or (done and processed == total):
+                        self.update_progress.emit(processed, total, found, time.time() - start_time)
+            
+            def produce(candidate):
+                nonlocal total_files
+                with counter_lock:
+                    total_files += 1
+                file_queue.put(candidate)
+            
+            def reuse(candidate):
+                """Változatlan fájl: az előző futás eredménye, a fájl megnyitása nélkül"""
+                nonlocal total_files, processed_files, found_files, reused_files
+                file_path, file_size, file_mtime = candidate
+                old = previous.get(file_path)
+                if old is None or old[0] != file_size or old[1] != file_mtime:
+                    return False
+                match_count, location, snippets = old[2], old[3], old[4]
+                if match_count > 0:
+                    self.file_found_single.emit(file_path, match_count, location,
+                                                json.loads(snippets) if snippets else [])
+                with counter_lock:
+                    total_files += 1
+                    processed_files += 1
+                    reused_files += 1
                     if match_count > 0:
                         found_files += 1
-                    
-                    if processed_files % batch_size == 0 or processed_files == total_files:
-                        elapsed = time.time() - start_time
-                        self.update_progress.emit(processed_files, total_files, found_files, elapsed)
+                    processed, found, total = processed_files, found_files, total_files
+                if processed % batch_size == 0:
+                    self.update_progress.emit(processed, total, found, time.time() - start_time)
+                return True
+            
+            doc_executor = ProcessPoolExecutor(max_workers=num_workers) if self.content_search else None
+            consumers = [threading.Thread(target=consumer, daemon=True) for _ in range(num_workers)]
+            for t in consumers:
+                t.start()
+            try:
+                for entry in self.iter_entries():
+                    candidate = self.prefilter(entry)
+                    if not candidate:
+                        continue
+                    if previous is not None:
+                        seen.add(candidate[0])
+                        if reuse(candidate):
+                            continue
+                    produce(candidate)
+                
+                with counter_lock:
+                    listing_done = True
+                    processed, found, total = processed_files, found_files, total_files
+                if not self.stop_flag:
+                    self.status_update.emit(f"Listázás kész ({total} elem), keresés...")
+                    if processed == total:
+                        self.update_progress.emit(processed, total, found, time.time() - start_time)
+            finally:
+                for _ in consumers:
+                    file_queue.put(None)
+                if self.stop_flag and doc_executor:
+                    doc_executor.shutdown(wait=False, cancel_futures=True)
+                for t in consumers:
+                    t.join()
+                if doc_executor:
+                    doc_executor.shutdown(wait=False, cancel_futures=True)
+                if store:
+                    # Megszakításkor a már megvizsgált fájlok eredménye is megmarad,
+                    # de az eltűnt fájlok csak teljes listázás után törölhetők
+                    removed = () if self.stop_flag else previous.keys() - seen
+                    store.update_results(self.saved_search_id, changed, removed)
+                    store.close()
             
-            self.status_update.emit("Keresés befejezve")
+            if previous is not None:
+                self.status_update.emit(f"Keresés befejezve ({len(changed)} új vagy módosult fájl, "
+                                        f"{reused_files} eredmény az előző futásból)")
+            else:
+                self.status_update.emit("Keresés befejezve")
             self.search_finished.emit()
         except Exception as e:
             self.status_update.emit(f"Hiba: {str(e)}")
 
+    def iter_entries(self):
+        """A keresendő elemek DirEntry-ként: a gyökérben a fájlok, alatta a fájlok
+        vagy (csak mappanév keresésnél) a mappák"""
+        stack = [self.folder]
+        while stack:
+            current = stack.pop()
+            at_root = current == self.folder
+            try:
+                it = os.scandir(current)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if self.stop_flag:
+                        return
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        stack.append(entry.path)
+                        if self.search_folders_only and not at_root:
+                            yield entry
+                    elif at_root or not self.search_folders_only:
+                        yield entry
+
+    def prefilter(self, entry):
+        """Kiterjesztés- és dátumszűrés a listázáskor kapott adatokból.
+
+        (útvonal, méret, mtime) hármast ad vissza, vagy None-t, ha az elem kiesik;
+        így a sorba csak a tartalomvizsgálatra érdemes fájlok kerülnek.
+        """
+        if self.exclude_extensions and not self.search_folders_only:
+            if entry.name.lower().endswith(self.excluded_suffixes):
+                return None
+        st = None
+        if self.start_ts is not None or self.end_ts is not None:
+            try:
+                st = entry.stat()
+            except OSError:
+                st = None
+            if st is not None:
+                if self.start_ts is not None and st.st_ctime < self.start_ts:
+                    return None
+                if self.end_ts is not None and st.st_ctime >= self.end_ts:
+                    return None
+        size = 0
+        mtime = 0.0
+        if self.content_search:
+            try:
+                st = st or entry.stat()
+                size, mtime = st.st_size, st.st_mtime
+            except OSError:
+                pass
+        return (entry.path, size, mtime)
+
+    def search_pdf_parallel(self, file_path, doc_executor):
+        """Nagy PDF oldaltartományainak szétosztása a process pool folyamatai között.
+
+        A teljes fájl gyorsítótárazott szövegénél nincs szétosztás (és
+        oldalszámlálás sem); egyébként minden tartomány a saját bejegyzését
+        olvassa és írja a feldolgozó folyamatban.
+        """
+        st = os.stat(file_path)
+        if text_cache.contains(file_path, st.st_size, st.st_mtime):
+            return wait_future(doc_executor.submit(count_pdf_matches, file_path, self.query), self.is_stopped)
+        page_count = wait_future(doc_executor.submit(pdf_page_count, file_path), self.is_stopped)
+        if page_count <= PDF_PAGES_PER_TASK:
+            return wait_future(doc_executor.submit(count_pdf_matches, file_path, self.query), self.is_stopped)
+        futures = [doc_executor.submit(count_pdf_range, file_path, self.query, first, first + PDF_PAGES_PER_TASK)
+                   for first in range(0, page_count, PDF_PAGES_PER_TASK)]
+        counts = self.query.new_counts()
+        page_hits = {}
+        snippets = []
+        for future in iter_completed(futures, self.is_stopped):
+            part_counts, part_hits, part_snippets = future.result()
+            for i, c in enumerate(part_counts):
+                counts[i] += c
+            page_hits.update(part_hits)
+            snippets.extend(part_snippets)
+            if self.stop_flag:
+                doc_executor.shutdown(wait=False, cancel_futures=True)
+                break
+            if self.query.can_stop(counts):
+                # A pool közös a többi fájllal, ezért itt csak a saját tartományok törlődnek
+                for f in futures:
+                    f.cancel()
+                break
+        snippets.sort(key=lambda sn: int(sn[0].split(".")[0]))
+        return counts, page_hits, snippets[:SNIPPET_LIMIT]
+
+    def is_stopped(self):
+        return self.stop_flag
+
     def stop(self):
         self.stop_flag = True
 
+class IndexSearchWorker(QThread):
+    """Keresés az invertált indexből, előtte a mappa inkrementális frissítésével"""
+    update_progress = pyqtSignal(int, int, int, float)
+    file_found_single = pyqtSignal(str, int, str, list)  # útvonal, találatszám, oldalak, környezetek
+    search_finished = pyqtSignal()
+    status_update = pyqtSignal(str)
+
+    def __init__(self, folder, pattern, start_date, end_date):
+        super().__init__()
+        self.folder = os.path.normpath(folder)
+        self.terms = query_terms(pattern)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.stop_flag = False
+        # Az index csak tartalmat tárol, ezért a bináris formátumok mindig kimaradnak
+        self.excluded_extensions = tuple(SearchWorker.EXCLUDED_EXTENSIONS)
+
+    def run(self):
+        index = None
+        error = None
+        try:
+            index = ContentIndex()
+            start_time = time.time()
+            if not self.terms:
+                self.status_update.emit("A kifejezés nem tartalmaz kereshető szót")
+                return
+            self.status_update.emit("Index frissítése...")
+            known = index.known_files(self.folder)
+            changed = []
+            seen = set()
+            for root, dirs, files in os.walk(self.folder):
+                if self.stop_flag:
+                    return
+                for name in files:
+                    if name.lower().endswith(self.excluded_extensions):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    seen.add(path)
+                    old = known.get(path)
+                    if old is None or old[1] != st.st_size or old[2] != st.st_mtime:
+                        changed.append((path, st.st_size, st.st_mtime))
+
+            for path in known.keys() - seen:
+                index.remove_file(known[path][0])
+
+            total = len(changed)
+            num_workers = max(1, os.cpu_count() - 1)
+            executor = ThreadPoolExecutor(max_workers=num_workers)
+            try:
+                futures = {executor.submit(index_file_tokens, p): (p, size, mtime)
+                           for p, size, mtime in changed}
+                for processed, future in enumerate(iter_completed(futures, self.is_stopped), 1):
+                    if self.stop_flag:
+                        break
+                    path, size, mtime = futures[future]
+                    try:
+                        tokens = future.result()
+                    except Exception:
+                        tokens = None
+                    if tokens is not None:
+                        index.store_file(path, size, mtime, tokens)
+                    elif path in known:
+                        # Olvashatatlan fájl: nem kerül (üresen) az indexbe, így a következő
+                        # frissítés újrapróbálja; az elavult szavai addig sem illeszkednek
+                        index.remove_file(known[path][0])
+                    if processed % 100 == 0 or processed == total:
+                        index.commit()
+                        self.update_progress.emit(processed, total, 0, time.time() - start_time)
+            finally:
+                # Leállításkor a még el nem kezdett fájlok törlődnek, a futókat nem várja meg
+                executor.shutdown(wait=False, cancel_futures=True)
+            index.commit()
+            if self.stop_flag:
+                return
+
+            self.status_update.emit("Keresés az indexben...")
+            found = 0
+            for path, count in sorted(index.query(self.folder, self.terms).items()):
+                if self.start_date or self.end_date:
+                    try:
+                        creation_date = datetime.fromtimestamp(os.path.getctime(path)).date()
+                        if self.start_date and creation_date < self.start_date:
+                            continue
+                        if self.end_date and creation_date > self.end_date:
+                            continue
+                    except OSError:
+                        continue
+                found += 1
+                self.file_found_single.emit(path, count, "", [])
+            self.update_progress.emit(total, total, found, time.time() - start_time)
+            self.status_update.emit(f"Keresés befejezve ({total} fájl újraindexelve)")
+        except Exception as e:
+            error = f"Hiba: {str(e)}"
+        finally:
+            if index:
+                index.close()
+            # Minden kilépéskor (leállítás és hiba esetén is), hogy a felület ne maradjon foglalt
+            self.search_finished.emit()
+            if error:
+                self.status_update.emit(error)
+
+    def is_stopped(self):
+        return self.stop_flag
+
+    def stop(self):
+        self.stop_flag = True
+
+SNIPPET_ROLE = Qt.UserRole + 1
+
+class SearchResultModel(QAbstractTableModel):
+    """Találatok táblája: soronként (útvonal, találatszám, oldalak, környezetek).
+
+    Nincs soronkénti widget, a memória- és elrendezési költség független a
+    találatok számától; a sorok kötegekben kerülnek be.
+    """
+    HEADERS = ["Fájl", "Találatok", "Oldalak", "Műveletek"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return row[0]
+            if col == 1:
+                return str(row[1])
+            if col == 2:
+                return row[2]
+        elif role == Qt.ToolTipRole and col == 0:
+            return row[0]
+        elif role == Qt.UserRole:
+            return row[0]
+        elif role == SNIPPET_ROLE:
+            return row[3]
+        return None
+
+    def add_rows(self, new_rows):
+        if not new_rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+        self.rows.extend(new_rows)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column > 2:
+            return
+        self.layoutAboutToBeChanged.emit()
+        key = (lambda r: r[1]) if column == 1 else (lambda r: r[column].lower())
+        self.rows.sort(key=key, reverse=(order == Qt.DescendingOrder))
+        self.layoutChanged.emit()
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Rajzolt "Fájl" / "Mappa" gombok a műveletek oszlopban, valódi widgetek nélkül"""
+    LABELS = ("Fájl", "Mappa")
+
+    def button_rects(self, rect):
+        width = min(50, (rect.width() - 6) // 2)
+        return [QRect(rect.x() + 2 + i * (width + 2), rect.y() + 2, width, rect.height() - 4)
+                for i in range(len(self.LABELS))]
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        for label, rect in zip(self.LABELS, self.button_rects(option.rect)):
+            painter.setPen(QPen(QColor("#444444")))
+            painter.setBrush(QColor("#5799AD"))
+            painter.drawRoundedRect(rect, 4, 4)
+            painter.setPen(QColor("white"))
+            painter.drawText(rect, Qt.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            path = index.data(Qt.UserRole)
+            for i, rect in enumerate(self.button_rects(option.rect)):
+                if rect.contains(event.pos()):
+                    open_with_application(path if i == 0 else os.path.dirname(path))
+                    return True
+        return super().editorEvent(event, model, option, index)
+
 class FileSearchApp(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.search_worker = None
-        self.results = []
+        self.pending_results = []
         self.set_dark_palette()
         self.init_ui()
         self.set_style()
@@ -268,7 +1430,7 @@ class FileSearchApp(QWidget):
             QPushButton#success:hover {
                 background-color: #219653;
             }
-            QLineEdit, QTreeWidget {
+            QLineEdit, QTreeView, QTextEdit {
                 background-color: #2D2D2D;
                 border: 1px solid #555555;
                 border-radius: 3px;
@@ -276,7 +1438,7 @@ class FileSearchApp(QWidget):
                 color: #DDDDDD;
                 font-size: 10pt;
             }
-            QTreeWidget {
+            QTreeView {
                 alternate-background-color: #353535;
             }
             QHeaderView::section {
@@ -342,6 +1504,21 @@ class FileSearchApp(QWidget):
         self.search_entry = QLineEdit()
         search_layout.addWidget(lbl_search)
         search_layout.addWidget(self.search_entry, 1)
+        self.query_mode = QComboBox()
+        self.query_mode.addItem("Egyszerű szöveg", QUERY_LITERAL)
+        self.query_mode.addItem("Több kifejezés (; elválasztva, -kizárás)", QUERY_TERMS)
+        self.query_mode.addItem("Reguláris kifejezés", QUERY_REGEX)
+        self.query_operator = QComboBox()
+        self.query_operator.addItem("VAGY", False)
+        self.query_operator.addItem("ÉS", True)
+        search_layout.addWidget(self.query_mode)
+        search_layout.addWidget(self.query_operator)
+        self.match_limit = QSpinBox()
+        self.match_limit.setRange(0, 1000000)
+        self.match_limit.setSpecialValueText("Nincs korlát")
+        self.match_limit.setToolTip("Fájlonként ennyi találat után a fájl olvasása leáll (0 = nincs korlát)")
+        search_layout.addWidget(QLabel("Találatkorlát/fájl:"))
+        search_layout.addWidget(self.match_limit)
         main_layout.addLayout(search_layout)
 
         options_frame = QGroupBox("Keresési beállítások")
@@ -351,11 +1528,19 @@ class FileSearchApp(QWidget):
         self.exclude_ext = QCheckBox("Fájlkiterjesztések kizárása")
         self.search_filenames = QCheckBox("Csak fájlnevekben keresés")
         self.search_folders = QCheckBox("Csak mappanevekben keresés")
+        self.use_index = QCheckBox("Keresés indexből (szóalapú, gyors ismételt keresés)")
+        self.use_index.setToolTip("Az első futás felépíti az indexet, később csak a megváltozott fájlokat dolgozza fel.\n"
+                                  "Teljes szavakra keres, a '*' végű szó előtagként illeszkedik.\n"
+                                  "Kis- és nagybetűt nem különböztet meg; a kifejezés típusa, a pontos egyezés és a\n"
+                                  "kiterjesztés-szűrés itt nem érvényes (a bináris fájlok mindig kimaradnak).")
         
         options_layout.addWidget(self.exact_match)
         options_layout.addWidget(self.exclude_ext)
         options_layout.addWidget(self.search_filenames)
         options_layout.addWidget(self.search_folders)
+        options_layout.addWidget(self.use_index)
+        for checkbox in (self.use_index, self.search_filenames, self.search_folders):
+            checkbox.toggled.connect(self.update_index_mode)
         
         date_layout = QHBoxLayout()
         lbl_date = QLabel("Létrehozás dátuma:")
@@ -375,6 +1560,24 @@ class FileSearchApp(QWidget):
         date_layout.addStretch()
           
         options_layout.addLayout(date_layout)
+        
+        saved_layout = QHBoxLayout()
+        lbl_saved = QLabel("Mentett keresés:")
+        self.saved_searches = QComboBox()
+        self.saved_searches.setToolTip("Mentett keresés újrafuttatásakor csak az új vagy módosult fájlok\n"
+                                       "kerülnek újra megvizsgálásra, a többi eredménye az előző futásból jön.")
+        self.saved_searches.activated.connect(self.load_saved_search)
+        btn_save_search = QPushButton("Keresés mentése")
+        btn_save_search.clicked.connect(self.save_search)
+        btn_delete_search = QPushButton("Törlés")
+        btn_delete_search.clicked.connect(self.delete_saved_search)
+        
+        saved_layout.addWidget(lbl_saved)
+        saved_layout.addWidget(self.saved_searches, 1)
+        saved_layout.addWidget(btn_save_search)
+        saved_layout.addWidget(btn_delete_search)
+        options_layout.addLayout(saved_layout)
+        self.refresh_saved_searches()
         main_layout.addWidget(options_frame)
 
         button_layout = QHBoxLayout()
@@ -391,21 +1594,42 @@ class FileSearchApp(QWidget):
         button_layout.addWidget(self.btn_search)
         button_layout.addWidget(self.btn_stop)
         button_layout.addWidget(self.btn_save)
+        self.auto_scroll = QCheckBox("Automatikus görgetés")
+        self.auto_scroll.setChecked(True)
+        button_layout.addWidget(self.auto_scroll)
         button_layout.addStretch()
         main_layout.addLayout(button_layout)
 
         results_frame = QGroupBox("Eredmények")
         results_layout = QVBoxLayout(results_frame)
         
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Fájl", "Találatok", "Műveletek"])
+        self.result_model = SearchResultModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.result_model)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
         self.tree.setSelectionMode(QAbstractItemView.SingleSelection)
         self.tree.setSortingEnabled(True)
         self.tree.setAlternatingRowColors(True)
         self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.setItemDelegateForColumn(3, ActionButtonDelegate(self.tree))
+        self.tree.setColumnWidth(3, 110)
         self.tree.setMinimumHeight(300)
         
+        self.tree.selectionModel().currentRowChanged.connect(self.show_snippets)
+        self.tree.doubleClicked.connect(lambda index: open_with_application(index.data(Qt.UserRole)))
         results_layout.addWidget(self.tree)
+        
+        # A beérkező találatok kötegelt beszúrása (nem soronként)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(250)
+        self.flush_timer.timeout.connect(self.flush_results)
+        
+        self.snippet_view = QTextEdit()
+        self.snippet_view.setReadOnly(True)
+        self.snippet_view.setMaximumHeight(130)
+        self.snippet_view.setPlaceholderText("Válassz ki egy találatot a környezet megjelenítéséhez")
+        results_layout.addWidget(self.snippet_view)
         main_layout.addWidget(results_frame, 1)
 
         status_layout = QHBoxLayout()
@@ -429,6 +1653,102 @@ class FileSearchApp(QWidget):
         if folder:
             self.folder_entry.setText(folder)
 
+    def search_definition(self):
+        return {
+            "folder": self.folder_entry.text(),
+            "pattern": self.search_entry.text(),
+            "query_mode": self.query_mode.currentData(),
+            "require_all": self.query_operator.currentData(),
+            "match_limit": self.match_limit.value(),
+            "exact_match": self.exact_match.isChecked(),
+            "exclude_ext": self.exclude_ext.isChecked(),
+            "filenames_only": self.search_filenames.isChecked(),
+            "folders_only": self.search_folders.isChecked(),
+            "use_index": self.use_index.isChecked(),
+            "start_date": self.start_date.text(),
+            "end_date": self.end_date.text(),
+        }
+
+    def refresh_saved_searches(self, current=None):
+        self.saved_searches.clear()
+        self.saved_searches.addItem("(nincs - egyszeri keresés)", None)
+        try:
+            store = SavedSearchStore()
+            try:
+                names = store.names()
+            finally:
+                store.close()
+        except sqlite3.Error:
+            names = []
+        for name in names:
+            self.saved_searches.addItem(name, name)
+        if current:
+            self.saved_searches.setCurrentIndex(max(0, self.saved_searches.findData(current)))
+
+    def load_saved_search(self, index):
+        name = self.saved_searches.itemData(index)
+        if not name:
+            return
+        store = SavedSearchStore()
+        try:
+            definition = store.definition(name)
+        finally:
+            store.close()
+        if not definition:
+            return
+        self.folder_entry.setText(definition.get("folder", ""))
+        self.search_entry.setText(definition.get("pattern", ""))
+        self.query_mode.setCurrentIndex(max(0, self.query_mode.findData(definition.get("query_mode", QUERY_LITERAL))))
+        self.query_operator.setCurrentIndex(max(0, self.query_operator.findData(definition.get("require_all", False))))
+        self.match_limit.setValue(definition.get("match_limit", 0))
+        self.exact_match.setChecked(definition.get("exact_match", False))
+        self.exclude_ext.setChecked(definition.get("exclude_ext", False))
+        self.search_filenames.setChecked(definition.get("filenames_only", False))
+        self.search_folders.setChecked(definition.get("folders_only", False))
+        self.use_index.setChecked(definition.get("use_index", False))
+        self.start_date.setText(definition.get("start_date", ""))
+        self.end_date.setText(definition.get("end_date", ""))
+
+    def save_search(self):
+        if not self.folder_entry.text() or not self.search_entry.text():
+            QMessageBox.warning(self, "Hiányzó adat", "Kérlek válassz mappát és adj meg kereső kifejezést!")
+            return
+        name, ok = QInputDialog.getText(self, "Keresés mentése", "A mentett keresés neve:",
+                                        text=self.saved_searches.currentData() or self.search_entry.text())
+        name = name.strip()
+        if not ok or not name:
+            return
+        store = SavedSearchStore()
+        try:
+            store.save(name, self.search_definition())
+        finally:
+            store.close()
+        self.refresh_saved_searches(name)
+
+    def delete_saved_search(self):
+        name = self.saved_searches.currentData()
+        if not name:
+            return
+        reply = QMessageBox.question(self, "Megerősítés", f"Törlöd a(z) '{name}' mentett keresést?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        store = SavedSearchStore()
+        try:
+            store.delete(name)
+        finally:
+            store.close()
+        self.refresh_saved_searches()
+
+    def index_mode(self):
+        return self.use_index.isChecked() and not (self.search_filenames.isChecked() or self.search_folders.isChecked())
+
+    def update_index_mode(self):
+        """Indexes keresésnél a szóalapú, kisbetűsített indexre nem értelmezhető beállítások tiltása"""
+        enabled = not self.index_mode()
+        for widget in (self.exact_match, self.exclude_ext, self.query_mode, self.query_operator, self.match_limit):
+            widget.setEnabled(enabled)
+
     def start_search(self):
         folder = self.folder_entry.text()
         pattern = self.search_entry.text()
@@ -436,6 +1756,8 @@ class FileSearchApp(QWidget):
         if not folder or not pattern:
             QMessageBox.warning(self, "Hiányzó adat", "Kérlek válassz mappát és adj meg kereső kifejezést!")
             return
+        if self.search_worker and self.search_worker.isRunning():
+            return
             
         start_date = None
         end_date = None
@@ -454,8 +1776,27 @@ class FileSearchApp(QWidget):
                 QMessageBox.warning(self, "Hibás dátum", "Érvénytelen záró dátum formátum! Használd az ÉÉÉÉ-HH-NN formátumot.")
                 return
         
-        self.tree.clear()
-        self.results = []
+        if self.query_mode.currentData() == QUERY_REGEX and not self.index_mode():
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                QMessageBox.warning(self, "Hibás kifejezés", f"Érvénytelen reguláris kifejezés!\n{e}")
+                return
+        
+        # Kiválasztott mentett keresésnél az aktuális beállítások felülírják a mentettet
+        # (változás esetén a tárolt eredmények elvesznek), majd a futás inkrementális
+        saved_search_id = None
+        saved_name = self.saved_searches.currentData()
+        if saved_name:
+            store = SavedSearchStore()
+            try:
+                saved_search_id = store.save(saved_name, self.search_definition())
+            finally:
+                store.close()
+        
+        self.result_model.clear()
+        self.pending_results = []
+        self.snippet_view.clear()
         
         self.btn_search.setEnabled(False)
         self.btn_stop.setEnabled(True)
@@ -463,29 +1804,43 @@ class FileSearchApp(QWidget):
         self.progress_bar.setValue(0)
         self.status_label.setText("Keresés folyamatban...")
         
-        self.search_worker = SearchWorker(
-            folder,
-            pattern,
-            self.exact_match.isChecked(),
-            self.exclude_ext.isChecked(),
-            self.search_filenames.isChecked(),
-            self.search_folders.isChecked(),
-            start_date,
-            end_date
-        )
+        if self.index_mode():
+            self.search_worker = IndexSearchWorker(
+                folder,
+                pattern,
+                start_date,
+                end_date
+            )
+        else:
+            self.search_worker = SearchWorker(
+                folder,
+                pattern,
+                self.exact_match.isChecked(),
+                self.exclude_ext.isChecked(),
+                self.search_filenames.isChecked(),
+                self.search_folders.isChecked(),
+                start_date,
+                end_date,
+                self.query_mode.currentData(),
+                self.query_operator.currentData(),
+                self.match_limit.value(),
+                saved_search_id
+            )
         
         self.search_worker.update_progress.connect(self.update_progress)
         self.search_worker.file_found_single.connect(self.add_result)
         self.search_worker.search_finished.connect(self.search_finished)
         self.search_worker.status_update.connect(self.status_label.setText)
+        self.search_worker.finished.connect(self.worker_finished)
+        self.flush_timer.start()
         self.search_worker.start()
 
     def stop_search(self):
-        if self.search_worker:
+        # Új keresés csak a szál tényleges leállása után indulhat (worker_finished)
+        if self.search_worker and self.search_worker.isRunning():
             self.search_worker.stop()
-        self.btn_search.setEnabled(True)
+            self.status_label.setText("Leállítás folyamatban...")
         self.btn_stop.setEnabled(False)
-        self.status_label.setText("Keresés leállítva")
 
     def update_progress(self, processed, total, found, elapsed_time):
         if total > 0:
@@ -506,71 +1861,59 @@ class FileSearchApp(QWidget):
                 f"Hátralévő idő: {time_str}"
             )
 
-    def add_result(self, file_path, match_count):
-        self.results.append((file_path, match_count))
-        
-        item = QTreeWidgetItem([
-            file_path,
-            str(match_count)
-        ])
-        
-        button_frame = QWidget()
-        button_layout = QHBoxLayout(button_frame)
-        button_layout.setContentsMargins(0, 0, 0, 0)
-        
-        btn_open = QPushButton("Fájl")
-        btn_open.setFixedWidth(40)
-        btn_open.clicked.connect(lambda checked, p=file_path: open_with_application(p))
-        
-        btn_folder = QPushButton("Mappa")
-        btn_folder.setFixedWidth(40)
-        btn_folder.clicked.connect(lambda checked, p=file_path: open_with_application(os.path.dirname(p)))
-        
-        button_layout.addWidget(btn_open)
-        button_layout.addWidget(btn_folder)
-        
-        self.tree.addTopLevelItem(item)
-        self.tree.setItemWidget(item, 2, button_frame)
-        
-        self.tree.scrollToItem(item)
+    def add_result(self, file_path, match_count, location="", snippets=None):
+        self.pending_results.append((file_path, match_count, location, snippets or []))
+
+    def flush_results(self):
+        if not self.pending_results:
+            return
+        batch, self.pending_results = self.pending_results, []
+        self.result_model.add_rows(batch)
+        if self.auto_scroll.isChecked():
+            self.tree.scrollToBottom()
+
+    def show_snippets(self, index, previous=None):
+        """A kiválasztott találat környezeteinek megjelenítése (csak kijelöléskor renderel)"""
+        if not index.isValid():
+            self.snippet_view.clear()
+            return
+        snippets = index.data(SNIPPET_ROLE) or []
+        if not snippets:
+            self.snippet_view.setPlainText("Nincs elérhető környezet ehhez a találathoz.")
+            return
+        lines = []
+        for label, text, start, length in snippets:
+            before = html.escape(text[:start])
+            hit = html.escape(text[start:start + length])
+            after = html.escape(text[start + length:])
+            lines.append(f"<span style='color:#888888'>[{html.escape(label)}]</span> "
+                         f"...{before}<b style='color:#F1C40F'>{hit}</b>{after}...")
+        self.snippet_view.setHtml("<br>".join(lines))
 
     def search_finished(self):
+        self.flush_timer.stop()
+        self.flush_results()
+        if self.search_worker.stop_flag:
+            self.status_label.setText(f"Keresés leállítva! Találatok: {len(self.result_model.rows)}")
+        else:
+            self.status_label.setText(f"Keresés befejezve! Találatok: {len(self.result_model.rows)}")
+
+    def worker_finished(self):
+        self.flush_timer.stop()
+        self.flush_results()
         self.btn_search.setEnabled(True)
         self.btn_stop.setEnabled(False)
-        self.status_label.setText(f"Keresés befejezve! Találatok: {len(self.results)}")
 
     def save_results(self):
-        if not self.results:
-            QMessageBox.information(self, "Nincs adat", "Nincs mentendő eredmény!")
-            return
-            
-        save_path, _ = QFileDialog.getSaveFileName(
+        self.flush_results()
+        rows = [(file_path, count, location) for file_path, count, location, _ in self.result_model.rows]
+        export_rows(
             self,
-            "Eredmények mentése",
-            f"{self.search_entry.text() or 'eredmeny'}.xlsx",
-            "Excel fájlok (*.xlsx)"
+            ["Fájl elérési út", "Találatok száma", "Oldalak"],
+            rows,
+            self.search_entry.text() or 'eredmeny',
+            on_saved=self.show_save_buttons
         )
-        
-        if not save_path:
-            return
-            
-        try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Eredmények"
-            
-            ws.append(["Fájl elérési út", "Találatok száma"])
-            
-            for file_path, count in self.results:
-                ws.append([file_path, count])
-            
-            wb.save(save_path)
-            QMessageBox.information(self, "Sikeres mentés", f"Eredmények mentve: {save_path}")
-            
-            self.show_save_buttons(save_path)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Hiba", f"Mentés sikertelen!\n{str(e)}")
 
     def show_save_buttons(self, save_path):
         for i in reversed(range(self.layout().count())):
@@ -1,31 +1,99 @@
 import sys
 import os
-import filecmp
+import hashlib
 import multiprocessing
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLineEdit, QPushButton, QFileDialog, QTextEdit, 
-                             QLabel, QGroupBox, QProgressBar, QGridLayout)
+                             QLabel, QGroupBox, QProgressBar, QGridLayout, QComboBox,
+                             QListWidget)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 
+# Tartalom-összehasonlítás ütemezési módjai
+ORDER_DEFAULT = 0
+ORDER_SMALLEST_FIRST = 1
+
+CHUNK_SIZE = 1024 * 1024
+
 # --- ÜZLETI LOGIKA (Külön folyamatban fut) ---
-def get_all_files_and_dirs(directory):
-    file_list = []
-    dir_list = []
-    for root, dirs, files in os.walk(directory):
-        for d in dirs:
-            dir_list.append(os.path.relpath(os.path.join(root, d), directory))
-        for f in files:
-            file_list.append(os.path.relpath(os.path.join(root, f), directory))
-    return set(file_list), set(dir_list)
+# A megszakítás jelzője, a pool minden folyamatában az initializer állítja be
+_cancel_event = None
+
+def init_compare_process(cancel_event):
+    global _cancel_event
+    _cancel_event = cancel_event
+
+def is_cancelled():
+    return _cancel_event is not None and _cancel_event.is_set()
+
+def scan_tree(directory, should_stop=None):
+    """Relatív útvonal -> méret szótár és a mappák halmaza egyetlen bejárással"""
+    file_sizes = {}
+    dir_set = set()
+    stack = [directory]
+    while stack:
+        if should_stop and should_stop():
+            break
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    rel_path = os.path.relpath(entry.path, directory)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_set.add(rel_path)
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            file_sizes[rel_path] = entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return file_sizes, dir_set
+
+def hash_file(args):
+    """Tartalom ujjlenyomat (BLAKE2b) blokkonkénti olvasással"""
+    key, path = args
+    if is_cancelled():
+        return key, None
+    try:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            while True:
+                if is_cancelled():
+                    return key, None
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return key, digest.hexdigest()
+    except OSError:
+        return key, None
+
+def files_equal(f1, f2):
+    """Bájtszintű összehasonlítás blokkonként, megszakításkor None-t ad vissza"""
+    if os.path.getsize(f1) != os.path.getsize(f2):
+        return False
+    with open(f1, 'rb') as a, open(f2, 'rb') as b:
+        while True:
+            if is_cancelled():
+                return None
+            chunk1 = a.read(CHUNK_SIZE)
+            chunk2 = b.read(CHUNK_SIZE)
+            if chunk1 != chunk2:
+                return False
+            if not chunk1:
+                return True
 
 def compare_file_pair(args):
     f1, f2, rel_path, name2 = args
+    if is_cancelled():
+        return None
     if not os.path.exists(f2):
         folder = os.path.dirname(rel_path) or "Gyökér"
         return f"[-] Hiányzik a(z) [{name2}] mappából | Elérési út: {folder} | Fájl: {os.path.basename(rel_path)}"
-    if not filecmp.cmp(f1, f2, shallow=False):
+    if files_equal(f1, f2) is False:
         folder = os.path.dirname(rel_path) or "Gyökér"
         return f"[!] ELTÉRŐ TARTALOM | Mappa: {folder} | Fájl: {os.path.basename(rel_path)}"
     return None
@@ -36,18 +104,36 @@ class CompareWorker(QThread):
     result_sig = pyqtSignal(list)
     status_sig = pyqtSignal(str)
 
-    def __init__(self, dir1, dir2):
+    def __init__(self, dir1, dir2, order=ORDER_DEFAULT):
         super().__init__()
         self.dir1 = dir1
         self.dir2 = dir2
+        self.order = order
         self.name1 = os.path.basename(self.dir1.rstrip(os.sep))
         self.name2 = os.path.basename(self.dir2.rstrip(os.sep))
+        self.cancelled = False
+        self.cancel_event = multiprocessing.Event()
+
+    def order_tasks(self, tasks, size_of):
+        """A feladatok sorrendje a választott ütemezés szerint.
+
+        A size_of a bejáráskor (scan_tree) gyűjtött méretekből dolgozik,
+        így a rendezés nem olvas újra a lemezről.
+        """
+        if self.order == ORDER_SMALLEST_FIRST:
+            return sorted(tasks, key=size_of)
+        return tasks
 
     def run(self):
         try:
             self.status_sig.emit("Struktúra elemzése...")
-            files1, dirs1 = get_all_files_and_dirs(self.dir1)
-            files2, dirs2 = get_all_files_and_dirs(self.dir2)
+            sizes1, dirs1 = scan_tree(self.dir1, self.is_stopped)
+            sizes2, dirs2 = scan_tree(self.dir2, self.is_stopped)
+            files1, files2 = set(sizes1), set(sizes2)
+            if self.cancelled:
+                self.result_sig.emit([])
+                self.status_sig.emit("Megszakítva")
+                return
             
             results = []
             
@@ -70,20 +156,151 @@ class CompareWorker(QThread):
                 results.append(f"[-] Hiányzik a(z) [{self.name1}] mappából | Mappa: {os.path.dirname(f) or 'Gyökér'} | Fájl: {os.path.basename(f)}")
 
             # 3. Bináris tartalom ellenőrzése
-            common = list(files1 & files2)
-            if common:
+            common = self.order_tasks(list(files1 & files2), sizes1.get)
+            if common and not self.cancelled:
                 self.status_sig.emit(f"Fájltartalom ellenőrzése ({len(common)} db)...")
                 tasks = [(os.path.join(self.dir1, f), os.path.join(self.dir2, f), f, self.name2) for f in common]
                 
-                with ProcessPoolExecutor(max_workers=multiprocessing.cpu_count()) as executor:
-                    for i, res in enumerate(executor.map(compare_file_pair, tasks)):
+                with ProcessPoolExecutor(max_workers=multiprocessing.cpu_count(),
+                                         initializer=init_compare_process,
+                                         initargs=(self.cancel_event,)) as executor:
+                    futures = [executor.submit(compare_file_pair, t) for t in tasks]
+                    for i, future in enumerate(as_completed(futures)):
+                        if self.cancelled:
+                            # A várakozó feladatok törlése, a futók a jelzőt figyelve kilépnek
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            break
+                        res = future.result()
                         if res:
                             results.append(res)
                         prog = int(((i + 1) / len(common)) * 100)
                         self.progress_sig.emit(prog)
             
             self.result_sig.emit(results)
-            self.status_sig.emit("Kész!")
+            self.status_sig.emit("Megszakítva" if self.cancelled else "Kész!")
+        except Exception as e:
+            self.status_sig.emit(f"Hiba történt: {str(e)}")
+
+    def is_stopped(self):
+        return self.cancelled
+
+    def stop(self):
+        self.cancelled = True
+        self.cancel_event.set()
+
+# Mátrix cellaértékek
+STATUS_OK = "OK"
+STATUS_MISSING = "HIÁNYZIK"
+STATUS_DIFFERENT = "ELTÉRŐ"
+STATUS_EXTRA = "TÖBBLET"
+STATUS_ERROR = "HIBA"
+
+def format_matrix(column_names, matrix):
+    """Fájl x mappa mátrix szöveges táblázattá alakítása (csak az eltérő sorok)"""
+    col_width = max([len(STATUS_MISSING)] + [len(n) for n in column_names]) + 2
+    lines = ["Fájl".ljust(60) + "".join(n.ljust(col_width) for n in column_names)]
+    lines.append("-" * len(lines[0]))
+    for rel_path in sorted(matrix):
+        statuses = matrix[rel_path]
+        if all(st == STATUS_OK for st in statuses):
+            continue
+        name = rel_path if len(rel_path) <= 58 else "..." + rel_path[-55:]
+        lines.append(name.ljust(60) + "".join(st.ljust(col_width) for st in statuses))
+    return lines
+
+class MultiCompareWorker(CompareWorker):
+    """Egy referencia mappa összevetése több replikával.
+
+    A referenciát egyszer járja be és minden fájlját egyszer hasheli, majd az
+    összes replika fájljait egyetlen közös process poolban ugyanahhoz az
+    ujjlenyomat-készlethez hasonlítja.
+    """
+    def __init__(self, ref_dir, target_dirs, order=ORDER_DEFAULT):
+        super().__init__(ref_dir, target_dirs[0], order)
+        self.target_dirs = target_dirs
+        self.ref_name = os.path.basename(ref_dir.rstrip(os.sep)) or ref_dir
+        self.target_names = [os.path.basename(d.rstrip(os.sep)) or d for d in target_dirs]
+
+    def run(self):
+        try:
+            self.status_sig.emit("Struktúra elemzése (referencia)...")
+            ref_files, ref_dirs = scan_tree(self.dir1, self.is_stopped)
+            targets = []
+            for i, target in enumerate(self.target_dirs):
+                self.status_sig.emit(f"Struktúra elemzése ({self.target_names[i]})...")
+                targets.append(scan_tree(target, self.is_stopped))
+            if self.cancelled:
+                self.result_sig.emit([])
+                self.status_sig.emit("Megszakítva")
+                return
+
+            results = []
+            extra_dirs = {}
+            for name, (_, t_dirs) in zip(self.target_names, targets):
+                for d in sorted(ref_dirs - t_dirs):
+                    results.append(f"!!! HIÁNYZIK A(Z) [{name}] MAPPÁBÓL (TELJES KÖNYVTÁR): {d}")
+                for d in t_dirs - ref_dirs:
+                    extra_dirs.setdefault(d, []).append(name)
+            # Csak replikában létező mappák: replikánként egyszer, a megtalálási helyekkel
+            for d in sorted(extra_dirs):
+                results.append(f"!!! HIÁNYZIK A(Z) [{self.ref_name}] MAPPÁBÓL (TELJES KÖNYVTÁR): {d} "
+                               f"| Megvan: {', '.join(extra_dirs[d])}")
+
+            # Mátrix feltöltése a méretek alapján, csak az azonos méretűeket kell hashelni.
+            # A 0. oszlop a referencia, a replikák a ti + 1. oszlopban vannak.
+            n = len(targets)
+            matrix = {rel: [STATUS_OK] * (n + 1) for rel in ref_files}
+            ref_needed = set()
+            target_tasks = []
+            for ti, (t_files, _) in enumerate(targets):
+                for rel, size in ref_files.items():
+                    t_size = t_files.get(rel)
+                    if t_size is None:
+                        matrix[rel][ti + 1] = STATUS_MISSING
+                    elif t_size != size:
+                        matrix[rel][ti + 1] = STATUS_DIFFERENT
+                    else:
+                        ref_needed.add(rel)
+                        target_tasks.append(((ti, rel), os.path.join(self.target_dirs[ti], rel)))
+                # Csak replikában létező fájl: a referenciából és a többi replikából
+                # hiányzik, amíg egy másik replika be nem jelenti többletként
+                for rel in t_files.keys() - ref_files.keys():
+                    matrix.setdefault(rel, [STATUS_MISSING] * (n + 1))[ti + 1] = STATUS_EXTRA
+
+            # Az ütemezés a referencia és a replikák közös feladatlistájára vonatkozik
+            tasks = [((-1, rel), os.path.join(self.dir1, rel)) for rel in ref_needed] + target_tasks
+            tasks = self.order_tasks(tasks, lambda task: ref_files[task[0][1]])
+            if tasks and not self.cancelled:
+                self.status_sig.emit(f"Ujjlenyomatok számítása ({len(tasks)} db)...")
+                digests = {}
+                with ProcessPoolExecutor(max_workers=multiprocessing.cpu_count(),
+                                         initializer=init_compare_process,
+                                         initargs=(self.cancel_event,)) as executor:
+                    futures = [executor.submit(hash_file, t) for t in tasks]
+                    for i, future in enumerate(as_completed(futures)):
+                        if self.cancelled:
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            break
+                        key, digest = future.result()
+                        digests[key] = digest
+                        self.progress_sig.emit(int(((i + 1) / len(tasks)) * 100))
+
+                if not self.cancelled:
+                    for (ti, rel), _ in target_tasks:
+                        ref_digest = digests.get((-1, rel))
+                        t_digest = digests.get((ti, rel))
+                        if ref_digest is None or t_digest is None:
+                            matrix[rel][ti + 1] = STATUS_ERROR
+                        elif ref_digest != t_digest:
+                            matrix[rel][ti + 1] = STATUS_DIFFERENT
+
+            if any(st != STATUS_OK for row in matrix.values() for st in row):
+                if results:
+                    results.append("")
+                results.extend(format_matrix([self.ref_name] + self.target_names, matrix))
+
+            self.result_sig.emit(results)
+            self.status_sig.emit("Megszakítva" if self.cancelled else "Kész!")
         except Exception as e:
             self.status_sig.emit(f"Hiba történt: {str(e)}")
 
@@ -91,6 +308,7 @@ class CompareWorker(QThread):
 class ProFolderDiff(QWidget):
     def __init__(self):
         super().__init__()
+        self.worker = None
         self.initUI()
 
     def initUI(self):
@@ -114,13 +332,43 @@ class ProFolderDiff(QWidget):
         grid.addWidget(QLabel("Összehasonlítandó:"), 1, 0)
         grid.addWidget(self.path2, 1, 1)
         grid.addWidget(btn2, 1, 2)
+
+        # További replikák (több célmappás mód)
+        self.extra_targets = QListWidget()
+        self.extra_targets.setMaximumHeight(80)
+        btn_add = QPushButton("Replika hozzáadása")
+        btn_remove = QPushButton("Replika eltávolítása")
+        btn_add.clicked.connect(self.add_target)
+        btn_remove.clicked.connect(self.remove_target)
+        extra_btns = QVBoxLayout()
+        extra_btns.addWidget(btn_add)
+        extra_btns.addWidget(btn_remove)
+        grid.addWidget(QLabel("További replikák:"), 2, 0)
+        grid.addWidget(self.extra_targets, 2, 1)
+        grid.addLayout(extra_btns, 2, 2)
         layout.addLayout(grid)
 
         self.run_btn = QPushButton("ELEMZÉS INDÍTÁSA")
         self.run_btn.setFixedHeight(50)
         self.run_btn.setStyleSheet("background-color: #2c3e50; color: white; font-weight: bold; font-size: 14px;")
         self.run_btn.clicked.connect(self.start_work)
-        layout.addWidget(self.run_btn)
+
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("Alapértelmezett sorrend", ORDER_DEFAULT)
+        self.order_combo.addItem("Legkisebb fájlok előre", ORDER_SMALLEST_FIRST)
+
+        self.stop_btn = QPushButton("MEGSZAKÍTÁS")
+        self.stop_btn.setFixedHeight(50)
+        self.stop_btn.setStyleSheet("background-color: #c0392b; color: white; font-weight: bold; font-size: 14px;")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_work)
+
+        btn_row = QHBoxLayout()
+        btn_row.addWidget(QLabel("Ütemezés:"))
+        btn_row.addWidget(self.order_combo)
+        btn_row.addWidget(self.run_btn, 1)
+        btn_row.addWidget(self.stop_btn)
+        layout.addLayout(btn_row)
 
         self.status_label = QLabel("Állapot: Készenlétben")
         layout.addWidget(self.status_label)
@@ -138,27 +386,59 @@ class ProFolderDiff(QWidget):
         d = QFileDialog.getExistingDirectory(self, "Válaszd ki a mappát")
         if d: edit.setText(d)
 
+    def add_target(self):
+        d = QFileDialog.getExistingDirectory(self, "Válaszd ki a replika mappát")
+        if d: self.extra_targets.addItem(d)
+
+    def remove_target(self):
+        for item in self.extra_targets.selectedItems():
+            self.extra_targets.takeItem(self.extra_targets.row(item))
+
     def start_work(self):
         d1, d2 = self.path1.text(), self.path2.text()
         if not os.path.isdir(d1) or not os.path.isdir(d2):
             return
+        extras = [self.extra_targets.item(i).text() for i in range(self.extra_targets.count())]
+        extras = [d for d in extras if os.path.isdir(d)]
 
         self.results.clear()
         self.run_btn.setEnabled(False)
-        self.worker = CompareWorker(d1, d2)
+        self.stop_btn.setEnabled(True)
+        if extras:
+            self.worker = MultiCompareWorker(d1, [d2] + extras, self.order_combo.currentData())
+        else:
+            self.worker = CompareWorker(d1, d2, self.order_combo.currentData())
         self.worker.progress_sig.connect(self.pbar.setValue)
         self.worker.status_sig.connect(self.status_label.setText)
         self.worker.result_sig.connect(self.finish_work)
+        # Hiba esetén nincs eredmény (result_sig), a gombok a szál végén állnak vissza
+        self.worker.finished.connect(self.work_finished)
         self.worker.start()
 
+    def stop_work(self):
+        if self.worker and self.worker.isRunning():
+            self.status_label.setText("Megszakítás folyamatban...")
+            self.stop_btn.setEnabled(False)
+            self.worker.stop()
+
     def finish_work(self, results):
-        if not results:
+        cancelled = self.worker.cancelled
+        if cancelled:
+            header = "ELEMZÉS MEGSZAKÍTVA (RÉSZLEGES EREDMÉNY)\n" + "="*80 + "\n\n"
+            self.results.setText(header + "\n".join(results))
+        elif not results and isinstance(self.worker, MultiCompareWorker):
+            self.results.setText("Minden replika tartalma megegyezik a referenciával!")
+        elif not results:
             self.results.setText("A két mappa tartalma megegyezik!")
         else:
-            header = f"ELEMZÉS EREDMÉNYE\n" + "="*80 + "\n\n"
+            header = "ELEMZÉS EREDMÉNYE\n" + "="*80 + "\n\n"
             self.results.setText(header + "\n".join(results))
+        if not cancelled:
+            self.pbar.setValue(100)
+
+    def work_finished(self):
         self.run_btn.setEnabled(True)
-        self.pbar.setValue(100)
+        self.stop_btn.setEnabled(False)
 
 if __name__ == '__main__':
     multiprocessing.freeze_support()
@@ -11,6 +11,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont, QBrush, QColor
+from exportalo import export_rows
 
 
 class SearchThread(QThread):
@@ -232,7 +233,17 @@ class FileFinderApp(QMainWindow):
         self.delete_btn.clicked.connect(self.delete_selected_files)
         self.delete_btn.setFixedHeight(40)
         self.delete_btn.setFont(QFont("Segoe UI", 10, QFont.Bold))
-        main_layout.addWidget(self.delete_btn)
+
+        # Export button
+        self.export_btn = QPushButton("Lista mentése")
+        self.export_btn.clicked.connect(self.export_list)
+        self.export_btn.setFixedHeight(40)
+        self.export_btn.setFont(QFont("Segoe UI", 10, QFont.Bold))
+
+        action_layout = QHBoxLayout()
+        action_layout.addWidget(self.delete_btn, 1)
+        action_layout.addWidget(self.export_btn)
+        main_layout.addLayout(action_layout)
 
     def browse_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Válassz mappát")
@@ -334,6 +345,24 @@ class FileFinderApp(QMainWindow):
         # Store full path for later access
         item.setData(0, Qt.UserRole, filepath)
 
+    def export_list(self):
+        rows = []
+        for i in range(self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(i)
+            rows.append([
+                item.text(0),
+                float(item.text(1)),
+                item.text(2),
+                item.data(0, Qt.UserRole)
+            ])
+        export_rows(
+            self,
+            ["Fájlnév", "Méret (MB)", "Módosítás dátuma", "Fájl elérési útja"],
+            rows,
+            "nagy_fajlok",
+            sheet_title="Fájlok"
+        )
+
     def update_selected_files(self):
         self.selected_files = []
         for item in self.tree.selectedItems():
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QAction, QStackedWidget, QWidget, 
     QVBoxLayout, QHBoxLayout, QLabel, QFileDialog, QMessageBox, QPushButton
@@ -116,6 +117,8 @@ class MainApp(QMainWindow):
         file_menu.addAction(exit_act)
 
 if __name__ == "__main__":
+    # A ProcessPoolExecutor-t használó modulok miatt (EXE-ben is)
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     if platform.system() == 'Windows':
         try:
@@ -126,7 +129,7 @@ if __name__ == "__main__":
     window.show()
     sys.exit(app.exec_())
  
- #   --add-data egyes.py;.  --add-data kettes.py;.   --add-data harmas.py;.   --add-data negyes.py;.   --add-data otos.py;.    --add-data hatos.py;.  --add-data hetes.py;.  --add-data nyolc.py;. --add-data kilenc.py;. --hidden-import=PyQt5.QtNetwork --hidden-import=PyQt5.QtPrintSupport --hidden-import=appdirs --hidden-import matplotlib.backends.backend_qt5agg --hidden-import matplotlib.backends.qt_compat  --hidden-import pefile --hidden-import numpy   --hidden-import pyodbc  --hidden-import mysql.connector --hidden-import docx   --hidden-import openpyxl   --hidden-import PyPDF2   --hidden-import PyQt5.QtMultimedia   --hidden-import PyQt5.QtMultimediaWidgets --hidden-import psutil --hidden-import GPUtil  --add-binary C:\Users\ap\AppData\Local\Programs\Python\Python313\Lib\site-packages\PyQt5\Qt5\plugins\imageformats;PyQt5\Qt5\plugins\multimedia  
+ #   --add-data egyes.py;.  --add-data kettes.py;.   --add-data harmas.py;.   --add-data negyes.py;.   --add-data otos.py;.    --add-data hatos.py;.  --add-data hetes.py;.  --add-data nyolc.py;. --add-data kilenc.py;. --add-data exportalo.py;. --hidden-import=PyQt5.QtNetwork --hidden-import=PyQt5.QtPrintSupport --hidden-import=appdirs --hidden-import matplotlib.backends.backend_qt5agg --hidden-import matplotlib.backends.qt_compat  --hidden-import pefile --hidden-import numpy   --hidden-import pyodbc  --hidden-import mysql.connector --hidden-import docx   --hidden-import openpyxl   --hidden-import PyPDF2   --hidden-import PyQt5.QtMultimedia   --hidden-import PyQt5.QtMultimediaWidgets --hidden-import psutil --hidden-import GPUtil  --add-binary C:\Users\ap\AppData\Local\Programs\Python\Python313\Lib\site-packages\PyQt5\Qt5\plugins\imageformats;PyQt5\Qt5\plugins\multimedia  
 r"""
 pyinstaller --noconfirm --onedir --windowed --clean `
 --name "Szita-suite" `
@@ -142,6 +145,7 @@ pyinstaller --noconfirm --onedir --windowed --clean `
 --add-data "hetesregi.py;." `
 --add-data "nyolc.py;." `
 --add-data "kilenc.py;." `
+--add-data "exportalo.py;." `
 --add-data "profiles.json;." `
 --add-data "C:/Users/ap/Documents/fajlkezelo-suite/icon.ico;." `
 --add-data "C:/Users/ap/Documents/fajlkezelo-suite/icon.png;." `